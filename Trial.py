@@ -5,12 +5,13 @@ import tkinter as tk
 from tkinter import *
 import warnings
 import numpy as np
-from qiskit import QuantumCircuit, transpile
-from qiskit_aer import AerSimulator
-from qiskit.visualization import visualize_transition
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-import matplotlib.pyplot as plt
-from matplotlib.widgets import Button
+
+import lazy
+from dialogs import DialogManager
+from history import GateHistory, apply_step
+from qiskit_cache import cached_transpile
+from sequence_view import SequenceView
+from worker import TkWorker
 
 # Suppress warnings
 warnings.simplefilter("ignore")
@@ -18,10 +19,38 @@ warnings.simplefilter("ignore")
 # Setup the quantum circuit
 def setup_circuit():
     global circuit, simulator
+    from qiskit import QuantumCircuit
     circuit = QuantumCircuit(1)
-    simulator = AerSimulator()
-
-setup_circuit()
+    simulator = get_simulator()
+
+# Qiskit and Aer are imported when the first gate is added (and preloaded in
+# the background once the window is up), so the window appears immediately
+circuit = None
+simulator = None
+
+def get_simulator():
+    """The AerSimulator, created on first use."""
+    global simulator
+    if simulator is None:
+        from qiskit_aer import AerSimulator
+        simulator = AerSimulator()
+    return simulator
+
+def ensure_circuit():
+    """Create the circuit if the app has not needed it yet."""
+    if circuit is None:
+        setup_circuit()
+    return circuit
+
+def reset_circuit():
+    """Drop the circuit; ensure_circuit creates an empty one when it is next needed."""
+    global circuit
+    circuit = None
+
+def trajectory(circuit):
+    """Transpile the circuit and compute its Bloch trajectory; runs on a worker thread."""
+    from animation import circuit_frames
+    return circuit_frames(cached_transpile(circuit, get_simulator()))
 
 theta = 0
 
@@ -37,20 +66,14 @@ class QuantumVisualizer:
 
     def __init__(self):
         self.visualization_window = None
+        self.dialogs = None
+        self.worker = None
+        # Every gate added, with O(1) undo/redo; the circuit mirrors its active gates
+        self.history = GateHistory()
+        self.view = None
 
-    @staticmethod
-    def show_about():
+    def show_about(self):
         """Display project information."""
-        about_window = tk.Tk()
-        about_window.title('About')
-        about_window.geometry('650x470')
-
-        info_label = tk.Label(about_window, text="About Quantum Visualizer:", font=("Arial", 14))
-        info_label.pack()
-
-        text_widget = tk.Text(about_window, height=20, width=20)
-        text_widget.pack(fill='both', expand=True)
-
         info_text = """
         About: Visualization tool for Single Qubit Rotation on Bloch Sphere
         BY:Team ÅvinyÅ 
@@ -71,46 +94,38 @@ class QuantumVisualizer:
 
         Allowed range for theta (rotation_angle) in the app is [-2*PI, 2*PI]
         """
-        text_widget.insert(END, info_text)
+        self.dialogs.about(info_text, heading="About Quantum Visualizer:")
 
-        about_window.mainloop()
+    def add_gate(self, name, theta=None):
+        """Apply a gate to the circuit and record it in the history and the display."""
+        apply_step(ensure_circuit(), name, theta)
+        self.history.append(name, theta)
+        self.view.refresh()
 
-    @staticmethod
-    def set_theta(num, window, circuit, key):
-        """Set theta value and close the input window."""
+    def set_theta(self, num, key):
+        """Set theta value and apply the rotation."""
         global theta
         theta = num * np.pi
-        if key == 'x':
-            circuit.rx(theta, 0)
-        elif key == 'y':
-            circuit.ry(theta, 0)
-        else:
-            circuit.rz(theta, 0)
+        self.add_gate('r' + key, theta)
         theta = 0
-        window.destroy()
 
-    def get_theta(self, circuit, key):
+    def get_theta(self, key):
         """Prompt user to input rotation angle for Rx, Ry, Rz gates."""
-        input_window = tk.Tk()
-        input_window.title('Input Theta')
-        input_window.geometry('540x270')
-        input_window.resizable(0, 0)
-
-        btns = [
-            ('PI/4', 0.25), ('PI/2', 0.50), ('PI', 1.0), ('2*PI', 2.0),
-            ('-PI/4', -0.25), ('-PI/2', -0.50), ('-PI', -1.0), ('-2*PI', -2.0)
-        ]
-
-        for idx, (text, val) in enumerate(btns):
-            btn = tk.Button(input_window, height=2, width=10, bg=BTN_COLOR, font=("Arial", 10), text=text,
-                            command=lambda v=val: self.set_theta(v, input_window, circuit, key))
-            btn.grid(row=idx//4, column=idx%4, padx=5, pady=5)
-
-        note_text = tk.Text(input_window, height=2, width=35, bg="light cyan")
-        note_text.insert(END, "Provide the value for theta\nRange: [-2*PI, 2*PI]")
-        note_text.grid(row=2, columnspan=4, pady=10)
-
-        input_window.mainloop()
+        self.dialogs.ask_theta(lambda num: self.set_theta(num, key), button_color=BTN_COLOR,
+                               state=self.history.state(), axis=key)
+
+    def undo(self):
+        """Remove the last gate; redo adds it back."""
+        if self.history.undo() is not None:
+            del ensure_circuit().data[-1]
+            self.view.refresh()
+
+    def redo(self):
+        """Reapply the last undone gate."""
+        step = self.history.redo()
+        if step is not None:
+            apply_step(ensure_circuit(), *step)
+            self.view.refresh()
 
     def visualize(self, circuit):
         """Visualize the quantum circuit's single qubit rotations."""
@@ -123,37 +138,53 @@ class QuantumVisualizer:
         vis_frame = tk.Frame(self.visualization_window)
         vis_frame.pack(fill='both', expand=True)
 
-        try:
-            transpiled = transpile(circuit, simulator)
-            fig = visualize_transition(circuit=transpiled)
+        # Transpiling and the trajectory run on a worker thread; a newer request supersedes this one
+        self.worker.submit('visualize', trajectory, circuit.copy(),
+                           on_done=lambda frames: self.show_trajectory(vis_frame, frames),
+                           on_error=self.visualization_failed)
 
-            canvas = FigureCanvasTkAgg(fig, master=vis_frame)
-            canvas.draw()
-            canvas.get_tk_widget().pack(fill='both', expand=True)
+    def show_trajectory(self, vis_frame, frames):
+        """Animate precomputed Bloch vectors in the visualization window."""
+        from matplotlib.widgets import Button
+        from animation import BlochAnimator
+
+        if not vis_frame.winfo_exists():
+            return
+        try:
+            animator = BlochAnimator(vis_frame)
+            animator.play_frames(frames)
+            fig = animator.figure
 
             # Create an "End" button on the Matplotlib figure
             end_ax = fig.add_axes([0.85, 0.05, 0.1, 0.075])
-            end_button = Button(end_ax, 'End')
+            self.end_button = Button(end_ax, 'End')
 
             def close_vis(event):
+                animator.stop()
                 self.visualization_window.destroy()
 
-            end_button.on_clicked(close_vis)
+            self.end_button.on_clicked(close_vis)
 
         except Exception as e:
-            print(e)
+            self.visualization_failed(e)
+
+    def visualization_failed(self, error):
+        print(error)
+        if self.visualization_window.winfo_exists():
             self.visualization_window.destroy()
 
     def main(self, testing=False):
         """Main application function."""
         try:
             root = tk.Tk()
+            self.dialogs = DialogManager(root)
+            self.worker = TkWorker(root)
             root.title('Quantum Visualizer')
             current_dir = os.path.dirname(os.path.abspath(__file__))
             # if system() == 'Windows':
             #     root.iconbitmap(default=os.path.join(current_dir, "../logo.ico"))
 
-            root.geometry('420x420')
+            root.geometry('420x540')
             root.resizable(0, 0)
 
             display_frame = tk.LabelFrame(root)
@@ -161,46 +192,40 @@ class QuantumVisualizer:
             display_frame.pack()
             button_frame.pack(fill='both', expand=True)
 
-            display = tk.Entry(display_frame, width=120, font=DISPLAY_FONT, bg=BG_COLOR, borderwidth=2, justify=LEFT)
-            display.pack(padx=3, pady=4)
-
-            def update_display(gate):
-                display.insert(END, gate)
-                if len(display.get()) == 10:
-                    for btn in buttons:
-                        btn.config(state=DISABLED)
+            # Only the visible window of the gate list is rendered, so it can grow without limit
+            self.view = SequenceView(display_frame, self.history, font=DISPLAY_FONT, bg=BG_COLOR)
+            self.view.pack(padx=3, pady=4)
 
             buttons = [
-                ('X', 'x', lambda: circuit.x(0)),
-                ('Y', 'y', lambda: circuit.y(0)),
-                ('Z', 'z', lambda: circuit.z(0)),
-                ('RX', 'Rx', lambda: self.get_theta(circuit, 'x')),
-                ('RY', 'Ry', lambda: self.get_theta(circuit, 'y')),
-                ('RZ', 'Rz', lambda: self.get_theta(circuit, 'z')),
-                ('S', 's', lambda: circuit.s(0)),
-                ('SD', 'sd', lambda: circuit.sdg(0)),
-                ('H', 'H', lambda: circuit.h(0)),
-                ('T', 't', lambda: circuit.t(0)),
-                ('TD', 'td', lambda: circuit.tdg(0))
+                ('X', lambda: self.add_gate('x')),
+                ('Y', lambda: self.add_gate('y')),
+                ('Z', lambda: self.add_gate('z')),
+                ('RX', lambda: self.get_theta('x')),
+                ('RY', lambda: self.get_theta('y')),
+                ('RZ', lambda: self.get_theta('z')),
+                ('S', lambda: self.add_gate('s')),
+                ('SD', lambda: self.add_gate('sdg')),
+                ('H', lambda: self.add_gate('h')),
+                ('T', lambda: self.add_gate('t')),
+                ('TD', lambda: self.add_gate('tdg'))
             ]
 
-            for i, (text, display_text, cmd) in enumerate(buttons):
-                btn = tk.Button(button_frame, font=BTN_FONT, bg=BTN_COLOR, text=text,
-                                command=lambda d=display_text, c=cmd: [update_display(d), c()])
+            for i, (text, cmd) in enumerate(buttons):
+                btn = tk.Button(button_frame, font=BTN_FONT, bg=BTN_COLOR, text=text, command=cmd)
                 btn.grid(row=i//3, column=i%3, padx=5, pady=5, sticky='WE')
-                buttons[i] = btn
 
             def clear_display(circuit):
-                display.delete(0, END)
-                setup_circuit()
-                for btn in buttons:
-                    btn.config(state=NORMAL)
+                self.history.clear()
+                self.view.follow()
+                reset_circuit()
 
             special_buttons = [
                 ('Quit', root.destroy),
-                ('Visualize', lambda: self.visualize(circuit)),
+                ('Visualize', lambda: self.visualize(ensure_circuit())),
                 ('Clear', lambda: clear_display(circuit)),
-                ('About', self.show_about)
+                ('About', self.show_about),
+                ('Undo', self.undo),
+                ('Redo', self.redo)
             ]
 
             for i, (text, cmd) in enumerate(special_buttons):
@@ -211,6 +236,7 @@ class QuantumVisualizer:
                 root.update_idletasks()
                 root.update()
             else:
+                lazy.preload()
                 root.mainloop()
 
             return True
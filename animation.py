@@ -0,0 +1,281 @@
+#Bloch sphere transitions: trajectory frames and a blitting animator
+import time
+import numpy as np
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+
+import bloch
+import optimizer
+import quaternion
+from sequence import OPCODES
+
+DEFAULT_FPS = 30
+DEFAULT_FRAMES_PER_GATE = 15
+# Upper bound on frames for a whole sequence; long sequences get fewer frames per gate
+DEFAULT_FRAME_BUDGET = 900
+
+# Instructions that do not rotate the state
+_SKIPPED = {'barrier', 'measure', 'reset', 'delay'}
+
+
+def frames_per_gate_for(num_gates, frames_per_gate=DEFAULT_FRAMES_PER_GATE, frame_budget=None):
+    """Frames per gate that keep num_gates gates within frame_budget frames."""
+    frames_per_gate = max(1, int(frames_per_gate))
+    if frame_budget and num_gates:
+        return max(1, min(frames_per_gate, int(frame_budget) // num_gates))
+    return frames_per_gate
+
+
+def rotation_frames(rotations, frames_per_gate=DEFAULT_FRAMES_PER_GATE, start=(0, 0, 1)):
+    """Bloch vectors along the trajectory of a sequence of quaternion rotations.
+
+    Every rotation contributes frames_per_gate vectors interpolated along
+    its arc, so the result has 1 + len(rotations) * frames_per_gate rows,
+    starting with start.
+    """
+    frames_per_gate = max(1, int(frames_per_gate))
+    fractions = np.arange(1, frames_per_gate + 1)[:, None] / frames_per_gate
+    vector = np.asarray(start, dtype=float)
+    frames = [vector[None, :]]
+    for q in rotations:
+        axis, angle = quaternion.to_axis_angle(q)
+        # Rodrigues' formula for every intermediate angle at once
+        cos = np.cos(angle * fractions)
+        sin = np.sin(angle * fractions)
+        segment = (vector * cos + np.cross(axis, vector) * sin
+                   + axis * np.dot(axis, vector) * (1 - cos))
+        frames.append(segment)
+        vector = segment[-1]
+    return np.concatenate(frames)
+
+
+def transition_frames(steps, frames_per_gate=DEFAULT_FRAMES_PER_GATE, start=(0, 0, 1),
+                      frame_budget=None):
+    """Bloch vectors along the gate-by-gate trajectory of a gate sequence.
+
+    steps is a sequence of (name, theta) pairs, theta being None for the
+    fixed gates.
+    """
+    rotations = [quaternion.gate_quaternion(name, theta) for name, theta in steps]
+    frames_per_gate = frames_per_gate_for(len(rotations), frames_per_gate, frame_budget)
+    return rotation_frames(rotations, frames_per_gate, start)
+
+
+def circuit_steps(circuit):
+    """(name, theta) pairs of the single-qubit gates in a circuit, in order.
+
+    Like circuit_rotations, but raises ValueError for Qiskit gates outside
+    the gate table (e.g. the u gates of a transpiled circuit).
+    """
+    if not hasattr(circuit, 'data'):
+        return list(circuit.gates)
+
+    steps = []
+    for instruction in circuit.data:
+        operation = getattr(instruction, 'operation', None) or instruction[0]
+        qubits = getattr(instruction, 'qubits', None) or instruction[1]
+        if operation.name in _SKIPPED or len(qubits) != 1 or qubits[0] != circuit.qubits[0]:
+            continue
+        if operation.name not in OPCODES:
+            raise ValueError(f"Unsupported gate: {operation.name}")
+        theta = float(operation.params[0]) if operation.name in ('rx', 'ry', 'rz') else None
+        steps.append((operation.name, theta))
+    return steps
+
+
+def circuit_rotations(circuit):
+    """Quaternions of the single-qubit gates in a circuit, in order.
+
+    Accepts a Qiskit QuantumCircuit (gates acting on its first qubit) or a
+    quantum_glasses.QuantumCircuit.
+    """
+    if not hasattr(circuit, 'data'):
+        return [quaternion.gate_quaternion(name, theta) for name, theta in circuit.gates]
+
+    rotations = []
+    for instruction in circuit.data:
+        operation = getattr(instruction, 'operation', None) or instruction[0]
+        qubits = getattr(instruction, 'qubits', None) or instruction[1]
+        if operation.name in _SKIPPED or len(qubits) != 1 or qubits[0] != circuit.qubits[0]:
+            continue
+        rotations.append(quaternion.from_unitary(operation.to_matrix()))
+    return rotations
+
+
+def circuit_frames(circuit, frames_per_gate=DEFAULT_FRAMES_PER_GATE, frame_budget=DEFAULT_FRAME_BUDGET,
+                   start=(0, 0, 1), optimize=False):
+    """Bloch trajectory of a circuit with an adaptive number of frames per gate.
+
+    With optimize the gates are first shortened by optimizer.optimize when
+    they are all in the gate table.
+    """
+    rotations = None
+    if optimize:
+        try:
+            steps, _ = optimizer.optimize(circuit_steps(circuit))
+            rotations = [quaternion.gate_quaternion(name, theta) for name, theta in steps]
+        except ValueError:
+            pass
+    if rotations is None:
+        rotations = circuit_rotations(circuit)
+    frames_per_gate = frames_per_gate_for(len(rotations), frames_per_gate, frame_budget)
+    return rotation_frames(rotations, frames_per_gate, start)
+
+
+def draw_sphere(ax):
+    """Draw the static Bloch sphere: wireframe, axes and labels."""
+    ax.plot_wireframe(*bloch.sphere_mesh(25), color='b', alpha=0.15, linewidth=0.5)
+    for axis in np.eye(3):
+        ax.plot(*np.stack([-axis, axis]).T, color='grey', linewidth=0.5)
+    ax.set_xlim([-1, 1])
+    ax.set_ylim([-1, 1])
+    ax.set_zlim([-1, 1])
+    ax.set_xlabel('X')
+    ax.set_ylabel('Y')
+    ax.set_zlabel('Z')
+
+
+class BlochAnimator:
+    """Animate Bloch vector trajectories inside a Tk widget.
+
+    The figure, canvas and sphere are created once. Each frame only moves
+    the state arrow and trail, which are blitted over a cached background.
+    """
+
+    def __init__(self, master, fps=DEFAULT_FPS, frames_per_gate=DEFAULT_FRAMES_PER_GATE,
+                 frame_budget=DEFAULT_FRAME_BUDGET, trail=True, figsize=(5, 5)):
+        self.master = master
+        self.fps = fps
+        self.frames_per_gate = frames_per_gate
+        self.frame_budget = frame_budget
+        self.trail = trail
+        self._frames = np.zeros((0, 3))
+        self._index = -1
+        self._started = 0.0
+        self._job = None
+        self._background = None
+
+        self.figure = Figure(figsize=figsize)
+        self.ax = self.figure.add_subplot(111, projection='3d')
+        draw_sphere(self.ax)
+        self.ax.set_title('Bloch Sphere')
+
+        self.arrow, = self.ax.plot([0, 0], [0, 0], [0, 1], color='r', linewidth=2, animated=True)
+        self.tip, = self.ax.plot([0], [0], [1], 'o', color='r', animated=True)
+        self.path, = self.ax.plot([], [], [], color='r', alpha=0.4, linewidth=1, animated=True)
+
+        self.canvas = FigureCanvasTkAgg(self.figure, master=master)
+        self.canvas.mpl_connect('draw_event', self._on_draw)
+        self.canvas.get_tk_widget().pack(fill='both', expand=True)
+        self.canvas.draw()
+
+    @property
+    def frames(self):
+        """Bloch vectors of the current (or last) animation."""
+        return self._frames
+
+    def _on_draw(self, event):
+        # Full redraws (first show, resize, mouse rotation) refresh the background
+        self._background = self.canvas.copy_from_bbox(self.figure.bbox)
+        self._blit()
+
+    def _blit(self):
+        if self._background is None:
+            return
+        self.canvas.restore_region(self._background)
+        for artist in (self.path, self.arrow, self.tip):
+            self.ax.draw_artist(artist)
+        self.canvas.blit(self.figure.bbox)
+
+    def show_vector(self, vector, index=None):
+        """Point the arrow at vector; index extends the trail up to that frame."""
+        x, y, z = vector
+        self.arrow.set_data_3d([0, x], [0, y], [0, z])
+        self.tip.set_data_3d([x], [y], [z])
+        if self.trail and index is not None:
+            trail = self._frames[:index + 1]
+            self.path.set_data_3d(trail[:, 0], trail[:, 1], trail[:, 2])
+        self._blit()
+
+    def play(self, steps, start=(0, 0, 1)):
+        """Animate the trajectory of a (name, theta) gate sequence."""
+        self.play_frames(transition_frames(steps, self.frames_per_gate, start, self.frame_budget))
+
+    def play_circuit(self, circuit, start=(0, 0, 1), optimize=False):
+        """Animate a Qiskit or quantum_glasses circuit."""
+        self.play_frames(circuit_frames(circuit, self.frames_per_gate, self.frame_budget, start, optimize))
+
+    def play_frames(self, frames):
+        """Animate a precomputed (M,3) array of Bloch vectors."""
+        self.stop()
+        self._frames = np.asarray(frames, dtype=float)
+        self._index = -1
+        self._started = time.perf_counter()
+        self.path.set_data_3d([], [], [])
+        self._step()
+
+    def _step(self):
+        # Frames are picked by elapsed time, so a slow draw drops frames
+        # instead of stretching the animation
+        self._job = None
+        if not self.master.winfo_exists():
+            return
+        elapsed = time.perf_counter() - self._started
+        index = min(int(elapsed * self.fps), len(self._frames) - 1)
+        if index > self._index:
+            self._index = index
+            self.show_vector(self._frames[index], index)
+        if self._index < len(self._frames) - 1:
+            next_frame = self._started + (self._index + 1) / self.fps
+            delay = max(1, int((next_frame - time.perf_counter()) * 1000))
+            self._job = self.master.after(delay, self._step)
+
+    def stop(self):
+        """Cancel a running animation, leaving the arrow where it is."""
+        if self._job is not None:
+            self.master.after_cancel(self._job)
+            self._job = None
+
+
+def visualize_transition(circuit, fps=DEFAULT_FPS, frames_per_gate=DEFAULT_FRAMES_PER_GATE,
+                         frame_budget=DEFAULT_FRAME_BUDGET, master=None, optimize=False):
+    """Animate a single-qubit circuit on the Bloch sphere.
+
+    Drop-in replacement for qiskit.visualization.visualize_transition
+    without its gate limit. With a Tk master the animation is embedded in
+    it and the BlochAnimator is returned; otherwise a pyplot figure driven
+    by FuncAnimation is returned, ready for plt.show(). optimize animates
+    the peephole-optimized sequence (see optimizer.optimize).
+    """
+    if master is not None:
+        animator = BlochAnimator(master, fps=fps, frames_per_gate=frames_per_gate, frame_budget=frame_budget)
+        animator.play_circuit(circuit, optimize=optimize)
+        return animator
+
+    return animate_frames(circuit_frames(circuit, frames_per_gate, frame_budget, optimize=optimize), fps)
+
+
+def animate_frames(frames, fps=DEFAULT_FPS):
+    """Pyplot figure animating a precomputed (M,3) array of Bloch vectors with FuncAnimation."""
+    import matplotlib.pyplot as plt
+    from matplotlib.animation import FuncAnimation
+
+    frames = np.asarray(frames, dtype=float)
+    fig = plt.figure(figsize=(5, 5))
+    ax = fig.add_subplot(111, projection='3d')
+    draw_sphere(ax)
+    ax.set_title('Bloch Sphere')
+    ax.plot([0, frames[0, 0]], [0, frames[0, 1]], [0, frames[0, 2]], color='b', linewidth=2)
+    arrow, = ax.plot([], [], [], color='r', linewidth=2, animated=True)
+    path, = ax.plot([], [], [], color='r', alpha=0.4, linewidth=1, animated=True)
+
+    def update(index):
+        x, y, z = frames[index]
+        arrow.set_data_3d([0, x], [0, y], [0, z])
+        path.set_data_3d(frames[:index + 1, 0], frames[:index + 1, 1], frames[:index + 1, 2])
+        return arrow, path
+
+    # Keep a reference on the figure, otherwise the animation is garbage collected
+    fig.transition_animation = FuncAnimation(fig, update, frames=len(frames), interval=1000 / fps,
+                                             blit=True, repeat=False)
+    return fig
@@ -0,0 +1,145 @@
+#headless batch evaluation of gate sequences, no Tk required
+"""Evaluate single-qubit gate sequences from the command line.
+
+Each input line is one sequence of whitespace separated gate tokens, e.g.
+
+    H T RX0.25 SD
+
+with rotation angles in multiples of PI. The final state, its Bloch
+vector and optionally measurement counts are written per line as CSV,
+JSONL or NPY.
+
+    python batch_cli.py sequences.txt -o results.csv
+    cat sequences.txt | python batch_cli.py --format jsonl --shots 1000
+"""
+import argparse
+import csv
+import json
+import os
+import sys
+import numpy as np
+
+import bloch
+import measurement
+import pipeline
+
+FORMATS = ('csv', 'jsonl', 'npy')
+
+RESULT_DTYPE = np.dtype([
+    ('state', np.complex128, (2,)),
+    ('bloch', np.float64, (3,)),
+    ('counts', np.int64, (2,)),
+])
+
+
+def simulate(sequence):
+    """Final state of |0> after the gates of a text sequence."""
+    return pipeline.final_state(sequence.split())
+
+
+def evaluate(lines, shots=0, rng=None):
+    """Yield (sequence, state, bloch_vector, counts) for every non-empty line.
+
+    counts is None unless shots is positive, in which case it holds the
+    number of 0 and 1 outcomes over shots measurements.
+    A line that does not parse raises ValueError with its line number.
+    """
+    rng = rng or np.random.default_rng()
+    for number, line in enumerate(lines, 1):
+        sequence = line.strip()
+        if not sequence or sequence.startswith('#'):
+            continue
+        try:
+            state = simulate(sequence)
+        except ValueError as e:
+            raise ValueError(f"line {number}: {e}") from e
+        counts = None
+        if shots:
+            counts = tuple(measurement.sample_counts(state, shots, rng))
+        yield sequence, state, bloch.bloch_vector(state), counts
+
+
+def write_csv(results, stream):
+    writer = csv.writer(stream)
+    writer.writerow(['sequence', 're0', 'im0', 're1', 'im1', 'x', 'y', 'z', 'count0', 'count1'])
+    for sequence, state, vector, counts in results:
+        writer.writerow([sequence, state[0].real, state[0].imag, state[1].real, state[1].imag,
+                         *vector, *(counts or ('', ''))])
+
+
+def write_jsonl(results, stream):
+    for sequence, state, vector, counts in results:
+        record = {
+            'sequence': sequence,
+            'state': [[a.real, a.imag] for a in state],
+            'bloch': vector.tolist(),
+        }
+        if counts is not None:
+            record['counts'] = {'0': int(counts[0]), '1': int(counts[1])}
+        stream.write(json.dumps(record) + '\n')
+
+
+def write_npy(results, stream):
+    # NPY needs the row count up front, so rows are collected first
+    rows = [(state, vector, counts or (0, 0)) for _, state, vector, counts in results]
+    np.save(stream, np.array(rows, dtype=RESULT_DTYPE))
+
+
+WRITERS = {'csv': write_csv, 'jsonl': write_jsonl, 'npy': write_npy}
+
+
+def input_path(path):
+    if path != '-' and not os.path.isfile(path):
+        raise argparse.ArgumentTypeError(f"no such file: {path}")
+    return path
+
+
+def non_negative_int(text):
+    value = int(text)
+    if value < 0:
+        raise argparse.ArgumentTypeError(f"must be non-negative: {text}")
+    return value
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Evaluate single-qubit gate sequences without a GUI.")
+    parser.add_argument('input', nargs='?', default='-', type=input_path, help="file with one sequence per line (default: stdin)")
+    parser.add_argument('-o', '--output', default='-', help="output file (default: stdout)")
+    parser.add_argument('-f', '--format', choices=FORMATS,
+                        help="output format (default: from the output extension, else csv)")
+    parser.add_argument('--shots', type=non_negative_int, default=0, help="measurement samples per sequence")
+    parser.add_argument('--seed', type=int, default=None, help="seed for measurement sampling")
+    args = parser.parse_args(argv)
+
+    fmt = args.format
+    if fmt is None:
+        extension = args.output.rsplit('.', 1)[-1].lower() if '.' in args.output else ''
+        fmt = extension if extension in FORMATS else 'csv'
+
+    # Every line is evaluated before the output is opened, so a bad line
+    # leaves no truncated output file behind
+    source = sys.stdin if args.input == '-' else open(args.input)
+    try:
+        results = list(evaluate(source, args.shots, np.random.default_rng(args.seed)))
+    except ValueError as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 1
+    finally:
+        if source is not sys.stdin:
+            source.close()
+
+    binary = fmt == 'npy'
+    if args.output == '-':
+        sink = sys.stdout.buffer if binary else sys.stdout
+    else:
+        sink = open(args.output, 'wb' if binary else 'w', newline=None if binary else '')
+    try:
+        WRITERS[fmt](results, sink)
+    finally:
+        if sink not in (sys.stdout, sys.stdout.buffer):
+            sink.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,168 @@
+#Bloch sphere helpers shared by the NumPy visualizers
+from functools import lru_cache
+import threading
+import numpy as np
+
+# Scratch buffers reused by bloch_vector for batched input, one per thread
+_local = threading.local()
+# Larger buffers are allocated per call instead of being kept around
+_SCRATCH_LIMIT = 1 << 16
+
+
+def _scratch_buffer(n):
+    if n > _SCRATCH_LIMIT:
+        return np.empty(n)
+    scratch = getattr(_local, 'scratch', None)
+    if scratch is None or scratch.size < n:
+        scratch = _local.scratch = np.empty(n)
+    return scratch[:n]
+
+
+def bloch_vector(states, out=None):
+    """Bloch vector(s) of single-qubit state(s), read straight off the amplitudes.
+
+    states is a single state of shape (2,) or (2,1), or a batch of shape
+    (N,2). Returns a (3,) or (N,3) array; pass out to reuse an existing
+    array instead of allocating one.
+    """
+    states = np.asarray(states)
+    if states.shape[-1] == 1:
+        states = states[..., 0]
+
+    if states.ndim == 1:
+        a, b = states[0], states[1]
+        ab = a.conjugate() * b
+        if out is None:
+            out = np.empty(3)
+        out[0] = 2 * ab.real
+        out[1] = 2 * ab.imag
+        out[2] = (a.real * a.real + a.imag * a.imag) - (b.real * b.real + b.imag * b.imag)
+        return out
+
+    if out is None:
+        out = np.empty((states.shape[0], 3))
+    ar, ai = states[:, 0].real, states[:, 0].imag
+    br, bi = states[:, 1].real, states[:, 1].imag
+    x, y, z = out[:, 0], out[:, 1], out[:, 2]
+    tmp = _scratch_buffer(states.shape[0])
+
+    # x = 2 Re(conj(a) b)
+    np.multiply(ar, br, out=x)
+    np.multiply(ai, bi, out=tmp)
+    np.add(x, tmp, out=x)
+    x *= 2
+    # y = 2 Im(conj(a) b)
+    np.multiply(ar, bi, out=y)
+    np.multiply(ai, br, out=tmp)
+    np.subtract(y, tmp, out=y)
+    y *= 2
+    # z = |a|^2 - |b|^2
+    np.multiply(ar, ar, out=z)
+    np.multiply(ai, ai, out=tmp)
+    np.add(z, tmp, out=z)
+    np.multiply(br, br, out=tmp)
+    np.subtract(z, tmp, out=z)
+    np.multiply(bi, bi, out=tmp)
+    np.subtract(z, tmp, out=z)
+    return out
+
+
+@lru_cache(maxsize=None)
+def sphere_mesh(resolution=100):
+    """Read-only (x, y, z) surface mesh of the unit sphere, computed once."""
+    u = np.linspace(0, 2 * np.pi, resolution)
+    v = np.linspace(0, np.pi, resolution)
+    mesh = (np.outer(np.cos(u), np.sin(v)),
+            np.outer(np.sin(u), np.sin(v)),
+            np.outer(np.ones(np.size(u)), np.cos(v)))
+    for part in mesh:
+        part.setflags(write=False)
+    return mesh
+
+
+class SphereBackground:
+    """Draw the sphere surface once and reuse the rendered bitmap.
+
+    The background (sphere, axes, labels) is rasterized on the first draw
+    and kept per figure size, DPI and view, for this figure only since
+    another figure may differ in title or artists. Later draws skip the
+    surface, restore the saved bitmap with canvas.restore_region and draw
+    only the animated artists on top.
+    Artists passed in must have been created with animated=True. While the
+    user rotates the view away from the initial one the sphere is simply
+    drawn in full.
+    """
+
+    # Saved regions kept per figure
+    max_regions = 8
+
+    def __init__(self, ax, artists=(), resolution=100, **surface_kw):
+        surface_kw.setdefault('color', 'b')
+        surface_kw.setdefault('alpha', 0.1)
+        self.ax = ax
+        self.figure = ax.figure
+        # (width, height, dpi, elev, azim) -> saved region, oldest first
+        self._regions = {}
+        self.artists = list(artists)
+        self.home_view = (ax.elev, ax.azim)
+        self.surface = ax.plot_surface(*sphere_mesh(resolution), **surface_kw)
+        self.figure.canvas.mpl_connect('draw_event', self._on_draw)
+
+    def _key(self):
+        width, height = self.figure.bbox.size.round().astype(int)
+        return (width, height, self.figure.dpi, self.ax.elev, self.ax.azim)
+
+    def _on_draw(self, event):
+        canvas = self.figure.canvas
+        key = self._key()
+        region = self._regions.get(key)
+        if region is None:
+            if not self.surface.get_visible():
+                # New size or view: the sphere has to be rendered again
+                self.surface.set_visible(True)
+                canvas.draw_idle()
+                return
+            if (self.ax.elev, self.ax.azim) == self.home_view:
+                if len(self._regions) >= self.max_regions:
+                    self._regions.pop(next(iter(self._regions)))
+                self._regions[key] = canvas.copy_from_bbox(self.figure.bbox)
+                self.surface.set_visible(False)
+        else:
+            canvas.restore_region(region)
+        for artist in self.artists:
+            self.ax.draw_artist(artist)
+        canvas.blit(self.figure.bbox)
+
+    def blit(self):
+        """Redraw only the animated artists, e.g. after moving them.
+
+        Falls back to a full draw when no background is saved for the
+        current size and view.
+        """
+        region = self._regions.get(self._key())
+        if region is None:
+            self.figure.canvas.draw_idle()
+            return
+        canvas = self.figure.canvas
+        canvas.restore_region(region)
+        for artist in self.artists:
+            self.ax.draw_artist(artist)
+        canvas.blit(self.figure.bbox)
+
+
+def plot_bloch_vectors(vectors, axes, resolution=25):
+    """Draw one sphere and arrow per (x, y, z) vector onto matching 3D axes.
+
+    Reduced states of entangled qubits are mixed, so their arrows are
+    shorter than the radius.
+    """
+    for qubit, (ax, vector) in enumerate(zip(axes, vectors)):
+        ax.plot_wireframe(*sphere_mesh(resolution), color='b', alpha=0.15, linewidth=0.5)
+        ax.quiver(0, 0, 0, *vector, color='r', arrow_length_ratio=0.1)
+        ax.set_xlim([-1, 1])
+        ax.set_ylim([-1, 1])
+        ax.set_zlim([-1, 1])
+        ax.set_xlabel('X')
+        ax.set_ylabel('Y')
+        ax.set_zlabel('Z')
+        ax.set_title(f'qubit {qubit}')
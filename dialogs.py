@@ -0,0 +1,251 @@
+#pooled Toplevel dialogs on the application's single Tk root
+"""Dialogs that are built once and then only shown and hidden.
+
+Every app has exactly one tk.Tk root and one mainloop. Dialogs are
+Toplevels of that root: the first open builds the widgets, closing
+withdraws the window and later opens just deiconify it again, so no
+extra Tcl interpreter or nested event loop is ever created.
+
+    dialogs = DialogManager(root)
+    dialogs.ask_theta(lambda num: circuit.rx(num * np.pi))
+
+DialogManager.stats() reports open latencies and the number of live Tcl
+interpreters; `python dialogs.py` measures both (needs a display).
+"""
+import gc
+import statistics
+import time
+import tkinter as tk
+import numpy as np
+
+import bloch
+import gates
+
+# Rotation angles offered by the theta dialog, in multiples of PI
+THETA_CHOICES = (
+    ('PI/4', 0.25), ('PI/2', 0.50), ('PI', 1.0), ('2*PI', 2.0),
+    ('-PI/4', -0.25), ('-PI/2', -0.50), ('-PI', -1.0), ('-2*PI', -2.0),
+)
+
+
+class Coalescer:
+    """Call function with only the latest submitted value, at most once per interval.
+
+    Values submitted while a call is pending replace each other, so a
+    burst of slider events costs one render instead of one per event.
+    """
+
+    def __init__(self, widget, function, interval_ms=16):
+        self.widget = widget
+        self.function = function
+        self.interval_ms = interval_ms
+        self._value = None
+        self._job = None
+
+    def submit(self, value):
+        self._value = value
+        if self._job is None:
+            self._job = self.widget.after(self.interval_ms, self._flush)
+
+    def cancel(self):
+        if self._job is not None:
+            self.widget.after_cancel(self._job)
+            self._job = None
+
+    def _flush(self):
+        self._job = None
+        self.function(self._value)
+
+
+def interpreter_count():
+    """Number of live tk.Tk instances, i.e. Tcl interpreters, in this process."""
+    return sum(1 for obj in gc.get_objects() if isinstance(obj, tk.Tk))
+
+
+class DialogManager:
+    """Pool of Toplevel dialogs owned by one root, keyed by name."""
+
+    def __init__(self, root):
+        self.root = root
+        self._dialogs = {}
+        # name -> seconds from each open request until the dialog was mapped
+        self.latencies = {}
+        self._on_theta = None
+        # Slider ticks are coalesced: at most one preview is drawn per frame, for the latest angle
+        self._preview = Coalescer(root, self._render_preview)
+
+    def dialog(self, name, build, title=None, geometry=None, resizable=True):
+        """The pooled Toplevel for name, created hidden and filled by build(window) on first use."""
+        window = self._dialogs.get(name)
+        if window is None or not window.winfo_exists():
+            window = tk.Toplevel(self.root)
+            window.withdraw()
+            window.transient(self.root)
+            if title:
+                window.title(title)
+            if geometry:
+                window.geometry(geometry)
+            if not resizable:
+                window.resizable(0, 0)
+            # Closing only hides the dialog, so the next open reuses it
+            window.protocol('WM_DELETE_WINDOW', window.withdraw)
+            build(window)
+            self._dialogs[name] = window
+        return window
+
+    def show(self, name, build, started=None, **options):
+        """Show the dialog called name, building it on the first call.
+
+        started is the perf_counter time the open was requested at, if
+        that was before this call.
+        """
+        started = started or time.perf_counter()
+        window = self.dialog(name, build, **options)
+        window.deiconify()
+        window.lift()
+        window.focus_set()
+        window.update_idletasks()
+        self.latencies.setdefault(name, []).append(time.perf_counter() - started)
+        return window
+
+    def hide(self, name):
+        window = self._dialogs.get(name)
+        if window is not None and window.winfo_exists():
+            window.withdraw()
+
+    def about(self, text, title='About', heading=None):
+        """Show a read-only text window, e.g. the project information."""
+        def build(window):
+            if heading:
+                tk.Label(window, text=heading, font=("Arial", 14)).pack()
+            text_widget = tk.Text(window, height=20, width=20)
+            text_widget.pack(fill='both', expand=True)
+            text_widget.insert(tk.END, text)
+            text_widget.config(state=tk.DISABLED)
+
+        return self.show('about', build, title=title, geometry='650x470')
+
+    def ask_theta(self, on_choice, button_color='#834550', state=None, axis='x'):
+        """Ask for a rotation angle; on_choice(num) gets it in multiples of PI.
+
+        Besides the fixed multiples of PI, any angle in [-2, 2] can be set
+        with the slider or typed in and applied. When the current
+        single-qubit state is given, the Bloch vector after the rotation
+        about axis is previewed live while dragging. Closing the dialog
+        without a choice does not call on_choice.
+        """
+        started = time.perf_counter()
+        self._on_theta = on_choice
+        self._preview_state = None if state is None else np.asarray(state, dtype=complex).reshape(2)
+        self._preview_axis = axis
+
+        def choose(num):
+            self._preview.cancel()
+            self.hide('theta')
+            callback, self._on_theta = self._on_theta, None
+            if callback is not None:
+                callback(num)
+
+        def build(window):
+            for idx, (text, val) in enumerate(THETA_CHOICES):
+                btn = tk.Button(window, height=2, width=10, bg=button_color, font=("Arial", 10), text=text,
+                                command=lambda v=val: choose(v))
+                btn.grid(row=idx // 4, column=idx % 4, padx=5, pady=5)
+
+            self._theta_value = tk.DoubleVar(window, value=0.0)
+            self._theta_text = tk.StringVar(window, value='0')
+            scale = tk.Scale(window, variable=self._theta_value, from_=-2.0, to=2.0, resolution=0.01,
+                             orient=tk.HORIZONTAL, label='theta / PI', command=self._slide)
+            scale.grid(row=2, column=0, columnspan=3, sticky='WE', padx=5)
+            entry = tk.Entry(window, textvariable=self._theta_text, width=8)
+            entry.grid(row=2, column=3, padx=5, sticky='S', pady=5)
+            entry.bind('<Return>', self._typed)
+
+            def apply_typed():
+                if self._typed():
+                    choose(self._theta_value.get())
+
+            apply = tk.Button(window, height=2, width=10, bg=button_color, font=("Arial", 10), text='Apply',
+                              command=apply_typed)
+            apply.grid(row=3, column=3, padx=5, pady=5)
+
+            note_text = tk.Text(window, height=2, width=35, bg="light cyan")
+            note_text.insert(tk.END, "Provide the value for theta\nRange: [-2*PI, 2*PI]")
+            note_text.config(state=tk.DISABLED)
+            note_text.grid(row=3, column=0, columnspan=3, pady=10)
+
+            self._preview_frame = tk.Frame(window)
+            self._preview_frame.grid(row=4, columnspan=4)
+            self._preview_animator = None
+
+        self.dialog('theta', build, title='Input Theta', resizable=False)
+        self._theta_value.set(0.0)
+        self._theta_text.set('0')
+        if self._preview_state is None:
+            self._preview_frame.grid_remove()
+        else:
+            self._preview_frame.grid()
+            self._render_preview(0.0)
+        return self.show('theta', build, started=started)
+
+    def _slide(self, value):
+        self._theta_text.set(f'{float(value):g}')
+        if self._preview_state is not None:
+            self._preview.submit(float(value))
+
+    def _typed(self, event=None):
+        """Move the slider to the typed angle; False if it is not a number in range."""
+        try:
+            num = float(self._theta_text.get())
+        except ValueError:
+            num = None
+        if num is None or not -2 <= num <= 2:
+            self._theta_text.set(f'{self._theta_value.get():g}')
+            return False
+        self._theta_value.set(num)
+        self._slide(num)
+        return True
+
+    def _render_preview(self, num):
+        """Draw the Bloch vector after rotating the previewed state by num * PI."""
+        if self._preview_animator is None:
+            from animation import BlochAnimator
+            self._preview_animator = BlochAnimator(self._preview_frame, trail=False, figsize=(3, 3))
+        matrix = gates.rotation(self._preview_axis, num * np.pi)
+        self._preview_animator.show_vector(bloch.bloch_vector(matrix @ self._preview_state))
+
+    def stats(self):
+        """First and median open latency per dialog (ms) and the interpreter count.
+
+        The first open includes building the widgets; later ones only map
+        the pooled window.
+        """
+        return {
+            'interpreters': interpreter_count(),
+            'dialogs': len(self._dialogs),
+            'latency_ms': {name: (times[0] * 1000, statistics.median(times) * 1000)
+                           for name, times in self.latencies.items()},
+        }
+
+
+def benchmark(repeat=20):
+    """Open and close the standard dialogs repeat times on a fresh root."""
+    root = tk.Tk()
+    root.withdraw()
+    dialogs = DialogManager(root)
+    for _ in range(repeat):
+        dialogs.about('About text')
+        dialogs.hide('about')
+        dialogs.ask_theta(lambda num: None, state=(1, 0))
+        dialogs.hide('theta')
+        root.update()
+    stats = dialogs.stats()
+    root.destroy()
+    return stats
+
+
+if __name__ == '__main__':
+    result = benchmark()
+    print(f"Tcl interpreters: {result['interpreters']}, pooled dialogs: {result['dialogs']}")
+    for name, (first, median) in result['latency_ms'].items():
+        print(f"{name:<8} first open {first:7.2f} ms   median open {median:7.2f} ms")
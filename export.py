@@ -0,0 +1,195 @@
+#headless export of Bloch sphere transitions to MP4, GIF or a PNG sequence
+import io
+import multiprocessing
+import os
+import subprocess
+import threading
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from matplotlib import rcParams
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+from animation import DEFAULT_FPS, DEFAULT_FRAMES_PER_GATE, DEFAULT_FRAME_BUDGET, circuit_frames, draw_sphere
+
+FORMATS = ('mp4', 'gif', 'png')
+# Frames rasterized per worker task
+CHUNK_SIZE = 32
+
+
+class SphereRenderer:
+    """Agg figure of the Bloch sphere that only redraws the arrow and trail.
+
+    The sphere is rasterized once; every render restores that background
+    and draws the state arrow (and trail) on top. A renderer must only be
+    used by one thread, see renderer().
+    """
+
+    def __init__(self, figsize=(5, 5), dpi=100):
+        self.figure = Figure(figsize=figsize, dpi=dpi)
+        self.canvas = FigureCanvasAgg(self.figure)
+        self.ax = self.figure.add_subplot(111, projection='3d')
+        draw_sphere(self.ax)
+        self.ax.set_title('Bloch Sphere')
+        self.arrow, = self.ax.plot([], [], [], color='r', linewidth=2, animated=True)
+        self.path, = self.ax.plot([], [], [], color='r', alpha=0.4, linewidth=1, animated=True)
+        self.canvas.draw()
+        self.background = self.canvas.copy_from_bbox(self.figure.bbox)
+
+    def render(self, vector, trail=None):
+        """(H,W,3) RGB image of the arrow at vector, with an optional (K,3) trail."""
+        x, y, z = vector
+        self.arrow.set_data_3d([0, x], [0, y], [0, z])
+        if trail is None:
+            self.path.set_data_3d([], [], [])
+        else:
+            self.path.set_data_3d(trail[:, 0], trail[:, 1], trail[:, 2])
+        self.canvas.restore_region(self.background)
+        self.ax.draw_artist(self.path)
+        self.ax.draw_artist(self.arrow)
+        return np.asarray(self.canvas.buffer_rgba())[..., :3].copy()
+
+
+_local = threading.local()
+
+
+def renderer(figsize=(5, 5), dpi=100):
+    """The calling thread's SphereRenderer for this size, created on first use."""
+    renderers = getattr(_local, 'renderers', None)
+    if renderers is None:
+        renderers = _local.renderers = {}
+    key = (tuple(figsize), dpi)
+    if key not in renderers:
+        renderers[key] = SphereRenderer(figsize, dpi)
+    return renderers[key]
+
+
+# Frames of the running export, set once per worker process by _load_frames
+_frames = None
+
+
+def _load_frames(frames):
+    global _frames
+    _frames = frames
+
+
+def _render_chunk(start, stop, figsize, dpi, trail):
+    """Rasterize frames[start:stop] of the loaded frames with Agg, returning RGB arrays.
+
+    Runs in a worker process, which keeps its renderer between chunks.
+    """
+    frames = _frames
+    sphere = renderer(figsize, dpi)
+    return [sphere.render(frames[index], frames[:index + 1] if trail else None)
+            for index in range(start, stop)]
+
+
+def render_image(vector, figsize=(5, 5), dpi=100):
+    """Rasterize the Bloch sphere with one state arrow as an (H,W,3) RGB array.
+
+    Uses Agg only, so it may run on a worker thread while Tk stays
+    responsive. Each thread draws the sphere once and then only the arrow.
+    """
+    return renderer(figsize, dpi).render(vector)
+
+
+def render_png(vector, figsize=(5, 5), dpi=100):
+    """Like render_image, encoded as PNG bytes (see worker.png_photo)."""
+    import matplotlib.image as mpimg
+    buffer = io.BytesIO()
+    # Fast zlib level: the image goes straight to Tk, so size matters less than latency
+    mpimg.imsave(buffer, render_image(vector, figsize, dpi), format='png', pil_kwargs={'compress_level': 1})
+    return buffer.getvalue()
+
+
+def _save_png_chunk(start, stop, figsize, dpi, trail, directory):
+    import matplotlib.image as mpimg
+    for offset, image in enumerate(_render_chunk(start, stop, figsize, dpi, trail)):
+        mpimg.imsave(os.path.join(directory, f'frame_{start + offset:05d}.png'), image)
+    return stop - start
+
+
+def _ordered_results(pool, function, chunks, *args, window):
+    """Run function(start, stop, *args) per chunk, yielding results in order.
+
+    At most window chunks are in flight, so finished frames never pile up
+    while an earlier chunk is still rendering.
+    """
+    pending = []
+    for start, stop in chunks:
+        pending.append(pool.submit(function, start, stop, *args))
+        if len(pending) >= window:
+            yield pending.pop(0).result()
+    for job in pending:
+        yield job.result()
+
+
+def export_frames(frames, path, fmt=None, fps=DEFAULT_FPS, figsize=(5, 5), dpi=100, trail=True,
+                  workers=None):
+    """Render an (M,3) array of Bloch vectors to a video, GIF or PNG directory.
+
+    fmt is 'mp4', 'gif' or 'png' and defaults to the extension of path;
+    for 'png' path is a directory that receives frame_00000.png etc.
+    Frames are rasterized in chunks across a pool of spawned processes
+    (workers processes, all CPUs by default) and written in order. MP4
+    output needs ffmpeg, GIF output needs Pillow and holds every frame in
+    memory.
+    """
+    frames = np.asarray(frames, dtype=float)
+    fmt = (fmt or os.path.splitext(path)[1].lstrip('.') or 'png').lower()
+    if fmt not in FORMATS:
+        raise ValueError(f"Unsupported export format: {fmt}")
+    if not len(frames):
+        raise ValueError("No frames to export")
+    chunks = [(start, min(start + CHUNK_SIZE, len(frames))) for start in range(0, len(frames), CHUNK_SIZE)]
+    window = 2 * (workers or os.cpu_count() or 1)
+
+    # Workers are spawned, not forked: the caller may be a Tk app with several threads.
+    # Each worker receives the frames once, so chunk tasks only carry their range
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'),
+                             initializer=_load_frames, initargs=(frames,)) as pool:
+        if fmt == 'png':
+            os.makedirs(path, exist_ok=True)
+            for _ in _ordered_results(pool, _save_png_chunk, chunks, figsize, dpi, trail, path,
+                                      window=window):
+                pass
+            return path
+
+        results = _ordered_results(pool, _render_chunk, chunks, figsize, dpi, trail, window=window)
+        if fmt == 'gif':
+            from PIL import Image
+            images = [Image.fromarray(image).quantize() for chunk in results for image in chunk]
+            images[0].save(path, save_all=True, append_images=images[1:],
+                           duration=int(1000 / fps), loop=0)
+            return path
+
+        encoder = None
+        try:
+            for chunk in results:
+                for image in chunk:
+                    if encoder is None:
+                        height, width = image.shape[:2]
+                        command = [rcParams['animation.ffmpeg_path'], '-y', '-loglevel', 'error',
+                                   '-f', 'rawvideo', '-pix_fmt', 'rgb24', '-s', f'{width}x{height}',
+                                   '-r', str(fps), '-i', '-',
+                                   '-vcodec', 'libx264', '-pix_fmt', 'yuv420p', path]
+                        try:
+                            encoder = subprocess.Popen(command, stdin=subprocess.PIPE)
+                        except FileNotFoundError as e:
+                            raise RuntimeError(f"ffmpeg not found: {command[0]} (set "
+                                               f"rcParams['animation.ffmpeg_path'])") from e
+                    encoder.stdin.write(image.tobytes())
+        finally:
+            if encoder is not None:
+                encoder.stdin.close()
+                encoder.wait()
+        if encoder is not None and encoder.returncode:
+            raise RuntimeError(f"ffmpeg exited with status {encoder.returncode}")
+        return path
+
+
+def export_transition(circuit, path, fmt=None, fps=DEFAULT_FPS, frames_per_gate=DEFAULT_FRAMES_PER_GATE,
+                      frame_budget=DEFAULT_FRAME_BUDGET, **kwargs):
+    """Export the gate-by-gate Bloch trajectory of a Qiskit or quantum_glasses circuit."""
+    frames = circuit_frames(circuit, frames_per_gate, frame_budget)
+    return export_frames(frames, path, fmt, fps, **kwargs)
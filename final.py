@@ -3,22 +3,42 @@ from platform import system
 import tkinter as tk
 from tkinter import *
 import numpy as np
-from qiskit import QuantumCircuit
-from qiskit.visualization import visualize_transition, plot_bloch_vector
-from qiskit.quantum_info import Statevector
-from matplotlib.lines import Line2D
-import matplotlib.pyplot as plt
+
+import lazy
+from dialogs import DialogManager
+from history import GateHistory, apply_step
+from sequence_view import SequenceView
+from worker import TkWorker
 
 # Ignore unnecessary warnings
 import warnings
 warnings.simplefilter("ignore")
 warnings.simplefilter("always")
 
+# Qiskit and Matplotlib are imported on first use (and preloaded in the
+# background once the window is up), so the window appears immediately
+circuit = None
+
 def initialize_circuit():
     global circuit
+    from qiskit import QuantumCircuit
     circuit = QuantumCircuit(1)
 
-initialize_circuit()
+def ensure_circuit():
+    """Create the circuit if the app has not needed it yet."""
+    if circuit is None:
+        initialize_circuit()
+    return circuit
+
+def reset_circuit():
+    """Drop the circuit; ensure_circuit creates an empty one when it is next needed."""
+    global circuit
+    circuit = None
+
+def trajectory(circuit):
+    """Bloch trajectory of the optimized circuit; runs on a worker thread."""
+    from animation import circuit_frames
+    return circuit_frames(circuit, optimize=True)
 
 theta = 0
 
@@ -26,15 +46,15 @@ class Quantum_Visualisation:
     
 
     def __init__(self):
-        pass
-
-    @staticmethod
-    def about():
+        self.worker = None
+        self.dialogs = None
+        self.visualization_window = None
+        # Every gate added, with O(1) undo/redo; the circuit mirrors its active gates
+        self.history = GateHistory()
+        self.view = None
+
+    def about(self):
         """Displays information about the project."""
-        about_window = tk.Tk()
-        about_window.title('About Quantum Glasses')
-        about_window.geometry('650x470')
-
         info_text = """
         About: Visualization tool for Single Qubit Rotation on Bloch Sphere
         BY:Team ÅvinyÅ 
@@ -56,70 +76,94 @@ class Quantum_Visualisation:
         Allowed range for theta (rotation_angle) in the app is [-2*PI, 2*PI]
         """
 
-        info_label = tk.Label(about_window, text=info_text, font=("Arial", 12), justify='left')
-        info_label.pack(expand=True, fill='both')
+        self.dialogs.about(info_text, title='About Quantum Glasses')
 
-        about_window.mainloop()
+    def add_gate(self, name, theta=None):
+        """Applies a gate to the circuit and records it in the history and the display."""
+        apply_step(ensure_circuit(), name, theta)
+        self.history.append(name, theta)
+        self.view.refresh()
 
-    @staticmethod
-    def change_theta(num, window, circuit, key):
-        """Changes the global variable theta and destroys the window."""
+    def change_theta(self, num, key):
+        """Changes the global variable theta and applies the rotation."""
         global theta
         theta = num * np.pi
-        if key == 'x':
-            circuit.rx(theta, 0)
-        elif key == 'y':
-            circuit.ry(theta, 0)
-        else:
-            circuit.rz(theta, 0)
+        self.add_gate('r' + key, theta)
         theta = 0
-        window.destroy()
 
-    def user_input(self, circuit, key):
+    def user_input(self, key):
         """Prompt user to input rotation angle for parameterized rotation gates Rx, Ry, Rz."""
-        input_window = tk.Tk()
-        input_window.title('Input Theta')
-        input_window.geometry('360x160')
+        self.dialogs.ask_theta(lambda num: self.change_theta(num, key), button_color='#834558',
+                               state=self.history.state(), axis=key)
+
+    def undo(self):
+        """Removes the last gate; it can be added back with redo."""
+        if self.history.undo() is not None:
+            del ensure_circuit().data[-1]
+            self.view.refresh()
+
+    def redo(self):
+        """Reapplies the last undone gate."""
+        step = self.history.redo()
+        if step is not None:
+            apply_step(ensure_circuit(), *step)
+            self.view.refresh()
+
+    def Visualise(self, circuit):
+        """Visualizes the quantum circuit's single qubit rotations.
+
+        The trajectory is computed on a worker thread, so the window stays
+        responsive; pressing Visualize again supersedes a pending request.
+        """
+        if self.visualization_window and self.visualization_window.winfo_exists():
+            self.visualization_window.destroy()
 
-        btns = [
-            ('PI/4', 0.25), ('PI/2', 0.50), ('PI', 1.0), ('2*PI', 2.0),
-            ('-PI/4', -0.25), ('-PI/2', -0.50), ('-PI', -1.0), ('-2*PI', -2.0)
-        ]
+        self.visualization_window = tk.Toplevel()
+        self.visualization_window.title("Visualization")
 
-        for idx, (text, val) in enumerate(btns):
-            btn = tk.Button(input_window, height=2, width=10, bg='#834558', font=("Arial", 10), text=text,
-                            command=lambda v=val: self.change_theta(v, input_window, circuit, key))
-            btn.grid(row=idx // 4, column=idx % 4, padx=5, pady=5)
+        vis_frame = tk.Frame(self.visualization_window)
+        vis_frame.pack(fill='both', expand=True)
 
-        note_text = tk.Text(input_window, height=2, width=35, bg="light cyan")
-        note_text.insert(tk.END, "Provide the value for theta\nRange: [-2*PI, 2*PI]")
-        note_text.grid(row=2, columnspan=4, pady=10)
+        self.worker.submit('visualise', trajectory, circuit.copy(),
+                           on_done=lambda frames: self.show_trajectory(vis_frame, frames),
+                           on_error=self.visualization_failed)
 
-        input_window.mainloop()
+    def show_trajectory(self, vis_frame, frames):
+        """Animates precomputed Bloch vectors in the visualization window."""
+        from matplotlib.lines import Line2D
+        from animation import BlochAnimator
 
-    @staticmethod
-    def Visualise(circuit):
-        """Visualizes the quantum circuit's single qubit rotations."""
+        if not vis_frame.winfo_exists():
+            return
         try:
-            fig, ax = plt.subplots()
-            visualize_transition(circuit=circuit)
-            
+            animator = BlochAnimator(vis_frame)
+            x, y, z = frames[0]
+            animator.ax.plot([0, x], [0, y], [0, z], color='b', linewidth=2)
+
             # Adding the legend
             legend_elements = [
                 Line2D([0], [0], marker='o', color='w', label='Initial State', markerfacecolor='b', markersize=10),
                 Line2D([0], [0], marker='o', color='w', label='Rotating Qubit', markerfacecolor='r', markersize=10),
                 # Add more as needed for different actions/colors
             ]
-            ax.legend(handles=legend_elements, loc='upper right')
+            animator.ax.legend(handles=legend_elements, loc='upper right')
+            animator.canvas.draw_idle()
 
-            plt.show()
+            animator.play_frames(frames)
         except Exception as e:
-            print(e)
+            self.visualization_failed(e)
 
-    def main(self):
+    def visualization_failed(self, error):
+        print(error)
+        if self.visualization_window.winfo_exists():
+            self.visualization_window.destroy()
+
+    def main(self, testing=False):
         """Main application function."""
         try:
             root = tk.Tk()
+            self.worker = TkWorker(root)
+            self.dialogs = DialogManager(root)
             root.title('Quantum Glasses')
 
             # Set the icon
@@ -128,7 +172,7 @@ class Quantum_Visualisation:
                 logo_path = os.path.join(current_directory, "../logo.ico")
                 root.iconbitmap(default=logo_path)
 
-            root.geometry('399x410')
+            root.geometry('399x530')
             root.resizable(0, 0)  # Blocking the resizing feature
 
             # Define Layout
@@ -137,29 +181,22 @@ class Quantum_Visualisation:
             display_frame.pack()
             button_frame.pack(fill='both', expand=True)
 
-            display = tk.Entry(display_frame, width=120, font=("Arial", 32), bg='#2c94c8', borderwidth=2, justify=LEFT)
-            display.pack(padx=3, pady=4)
-
-            def display_gate(gate_input):
-                """Adds a corresponding gate notation in the display to track the operations."""
-                display.insert(tk.END, gate_input)
-                num_gates_pressed = len(display.get())
-                if num_gates_pressed == 10:
-                    for btn in gate_buttons:
-                        btn.config(state=DISABLED)
+            # Only the visible window of the gate list is rendered, so it can grow without limit
+            self.view = SequenceView(display_frame, self.history, font=("Arial", 32), bg='#2c94c8')
+            self.view.pack(padx=3, pady=4)
 
             gate_buttons = [
-                ('X', lambda: [display_gate('X'), circuit.x(0)]),
-                ('Y', lambda: [display_gate('Y'), circuit.y(0)]),
-                ('Z', lambda: [display_gate('Z'), circuit.z(0)]),
-                ('RX', lambda: [display_gate('RX'), self.user_input(circuit, 'x')]),
-                ('RY', lambda: [display_gate('RY'), self.user_input(circuit, 'y')]),
-                ('RZ', lambda: [display_gate('RZ'), self.user_input(circuit, 'z')]),
-                ('S', lambda: [display_gate('S'), circuit.s(0)]),
-                ('SD', lambda: [display_gate('SD'), circuit.sdg(0)]),
-                ('H', lambda: [display_gate('H'), circuit.h(0)]),
-                ('T', lambda: [display_gate('T'), circuit.t(0)]),
-                ('TD', lambda: [display_gate('TD'), circuit.tdg(0)])
+                ('X', lambda: self.add_gate('x')),
+                ('Y', lambda: self.add_gate('y')),
+                ('Z', lambda: self.add_gate('z')),
+                ('RX', lambda: self.user_input('x')),
+                ('RY', lambda: self.user_input('y')),
+                ('RZ', lambda: self.user_input('z')),
+                ('S', lambda: self.add_gate('s')),
+                ('SD', lambda: self.add_gate('sdg')),
+                ('H', lambda: self.add_gate('h')),
+                ('T', lambda: self.add_gate('t')),
+                ('TD', lambda: self.add_gate('tdg'))
             ]
 
             for i, (text, cmd) in enumerate(gate_buttons):
@@ -168,22 +205,29 @@ class Quantum_Visualisation:
 
             def clear_display():
                 """Clears the display and reinitializes the Quantum Circuit."""
-                display.delete(0, END)
-                initialize_circuit()
-                for btn in gate_buttons:
-                    btn.config(state=NORMAL)
+                self.history.clear()
+                self.view.follow()
+                reset_circuit()
 
             special_buttons = [
                 ('Quit', root.destroy),
-                ('Visualize', lambda: self.Visualise(circuit)),
+                ('Visualize', lambda: self.Visualise(ensure_circuit())),
                 ('Clear', lambda: clear_display()),
-                ('About', self.about)
+                ('About', self.about),
+                ('Undo', self.undo),
+                ('Redo', self.redo)
             ]
 
             for i, (text, cmd) in enumerate(special_buttons):
                 btn = tk.Button(button_frame, font=("Arial", 18), bg='#bc3454', text=text, command=cmd)
                 btn.grid(row=4 + i // 2, column=i % 2 * 2, columnspan=2, sticky='WE', padx=10, pady=10)
 
+            if testing:
+                root.update_idletasks()
+                root.update()
+                return True
+
+            lazy.preload()
             root.mainloop()
 
             return True
@@ -0,0 +1,175 @@
+#shared single-qubit gate matrices for the NumPy simulators
+import threading
+import numpy as np
+
+# Rotation angles are rounded to this step to key the cache, so angles that
+# differ only by float noise share one matrix
+ANGLE_QUANTUM = 1e-9
+# Cached rotation matrices, oldest evicted first
+ROTATION_CACHE_SIZE = 4096
+
+
+def _constant(matrix):
+    """Freeze a gate matrix so it can be shared safely."""
+    matrix = np.array(matrix, dtype=complex)
+    matrix.setflags(write=False)
+    return matrix
+
+
+I = _constant([[1, 0], [0, 1]])
+X = _constant([[0, 1], [1, 0]])
+Y = _constant([[0, -1j], [1j, 0]])
+Z = _constant([[1, 0], [0, -1]])
+H = _constant(np.array([[1, 1], [1, -1]]) / np.sqrt(2))
+S = _constant([[1, 0], [0, 1j]])
+SDG = _constant([[1, 0], [0, -1j]])
+T = _constant([[1, 0], [0, np.exp(1j * np.pi / 4)]])
+TDG = _constant([[1, 0], [0, np.exp(-1j * np.pi / 4)]])
+
+# Registry of the fixed gates, keyed by their circuit method names
+GATES = {
+    'id': I,
+    'x': X,
+    'y': Y,
+    'z': Z,
+    'h': H,
+    's': S,
+    'sdg': SDG,
+    't': T,
+    'tdg': TDG,
+}
+
+
+_rotations = {}
+_rotations_lock = threading.Lock()
+
+
+def _rotation(axis, theta):
+    step = theta / ANGLE_QUANTUM
+    # NaN, infinite and huge angles have no meaningful step; compute them directly
+    if not abs(step) < 2 ** 53:
+        return _rotation_matrix(axis, theta)
+    key = (axis, round(step))
+    with _rotations_lock:
+        matrix = _rotations.get(key)
+    if matrix is None:
+        # Computed from the exact angle, not the rounded one
+        matrix = _rotation_matrix(axis, theta)
+        with _rotations_lock:
+            if len(_rotations) >= ROTATION_CACHE_SIZE:
+                _rotations.pop(next(iter(_rotations)))
+            matrix = _rotations.setdefault(key, matrix)
+    return matrix
+
+
+def _rotation_matrix(axis, theta):
+    c = np.cos(theta / 2)
+    s = np.sin(theta / 2)
+    if axis == 'x':
+        matrix = [[c, -1j * s], [-1j * s, c]]
+    elif axis == 'y':
+        matrix = [[c, -s], [s, c]]
+    else:
+        matrix = [[np.exp(-1j * theta / 2), 0], [0, np.exp(1j * theta / 2)]]
+    return _constant(matrix)
+
+
+def rotation_stack(axis, thetas):
+    """Return an (N,2,2) stack of rotations about 'x', 'y' or 'z', one per angle."""
+    thetas = np.asarray(thetas, dtype=float).reshape(-1)
+    c = np.cos(thetas / 2)
+    s = np.sin(thetas / 2)
+    stack = np.zeros((thetas.size, 2, 2), dtype=complex)
+    if axis == 'x':
+        stack[:, 0, 0] = c
+        stack[:, 0, 1] = -1j * s
+        stack[:, 1, 0] = -1j * s
+        stack[:, 1, 1] = c
+    elif axis == 'y':
+        stack[:, 0, 0] = c
+        stack[:, 0, 1] = -s
+        stack[:, 1, 0] = s
+        stack[:, 1, 1] = c
+    else:
+        stack[:, 0, 0] = c - 1j * s
+        stack[:, 1, 1] = c + 1j * s
+    return stack
+
+
+def rotation(axis, theta):
+    """Return the rotation matrix about 'x', 'y' or 'z' by theta.
+
+    A scalar theta gives a cached read-only (2,2) matrix, an array of
+    angles gives an (N,2,2) stack.
+    """
+    if np.ndim(theta):
+        return rotation_stack(axis, theta)
+    return _rotation(axis, float(theta))
+
+
+def rx(theta):
+    return rotation('x', theta)
+
+
+def ry(theta):
+    return rotation('y', theta)
+
+
+def rz(theta):
+    return rotation('z', theta)
+
+
+def gate(name, theta=None):
+    """Look up a gate matrix by name, e.g. gate('h') or gate('rx', np.pi)."""
+    if name in GATES:
+        return GATES[name]
+    if name in ('rx', 'ry', 'rz'):
+        return rotation(name[1], theta)
+    raise ValueError(f"Unknown gate: {name}")
+
+
+# Gate tokens used in text gate sequences, e.g. "H T RX0.25 SD"
+TOKENS = {
+    'I': 'id',
+    'X': 'x',
+    'Y': 'y',
+    'Z': 'z',
+    'H': 'h',
+    'S': 's',
+    'SD': 'sdg',
+    'T': 't',
+    'TD': 'tdg',
+}
+
+
+def parse_gate(token):
+    """Parse one gate token into a (name, theta) pair.
+
+    Rotation tokens carry their angle in multiples of PI, as in the
+    theta picker of the apps: 'RX0.25' is ('rx', PI/4).
+    """
+    key = token.upper()
+    if key in TOKENS:
+        return TOKENS[key], None
+    if key[:2] in ('RX', 'RY', 'RZ'):
+        try:
+            theta = float(key[2:]) * np.pi
+        except ValueError:
+            theta = None
+        if theta is not None:
+            if not np.isfinite(theta):
+                raise ValueError(f"Rotation angle must be finite: {token}")
+            return key[:2].lower(), theta
+    raise ValueError(f"Unknown gate token: {token}")
+
+
+_NAMES_TO_TOKENS = {name: token for token, name in TOKENS.items()}
+
+
+def gate_token(name, theta=None):
+    """Inverse of parse_gate: ('rx', PI/4) -> 'RX0.25'."""
+    if name in _NAMES_TO_TOKENS:
+        return _NAMES_TO_TOKENS[name]
+    if name in ('rx', 'ry', 'rz'):
+        return f'{name.upper()}{theta / np.pi:g}'
+    raise ValueError(f"Unknown gate: {name}")
@@ -0,0 +1,108 @@
+#gate history with O(1) undo/redo backed by a stack of cumulative unitaries
+import bloch
+import gates
+from sequence import GateSequence
+from timeline import Timeline
+
+
+class GateHistory:
+    """Growing single-qubit gate list with undo, redo and per-step unitaries.
+
+    The gates are indexed by a Timeline that stores the product of the
+    first k gates for every k. Undo and redo only move a cursor over the
+    stored gates and products, so they are O(1), the state after any of
+    the active gates is a lookup and the product of any range of them
+    takes O(log n).
+    """
+
+    __slots__ = ('_steps', '_timeline', '_size')
+
+    def __init__(self, steps=(), capacity=64):
+        # All stored gates, including the ones that were undone and can be redone
+        self._steps = GateSequence(capacity=capacity)
+        self._timeline = Timeline(capacity=capacity)
+        self._size = 0
+        for name, theta in steps:
+            self.append(name, theta)
+
+    def __len__(self):
+        return self._size
+
+    def append(self, name, theta=None):
+        """Add a gate after the current one, discarding the redo tail."""
+        matrix = gates.gate(name, theta)
+        self._steps.truncate(self._size)
+        self._steps.append(name, theta)
+        self._timeline.truncate(self._size)
+        self._timeline.append(matrix)
+        self._size += 1
+
+    @property
+    def can_undo(self):
+        return self._size > 0
+
+    @property
+    def can_redo(self):
+        return self._size < len(self._steps)
+
+    def undo(self):
+        """Step back one gate and return it as (name, theta), or None at the start."""
+        if not self.can_undo:
+            return None
+        self._size -= 1
+        return self._steps[self._size]
+
+    def redo(self):
+        """Reapply the last undone gate and return it, or None if there is none."""
+        if not self.can_redo:
+            return None
+        self._size += 1
+        return self._steps[self._size - 1]
+
+    def clear(self):
+        self._steps.clear()
+        self._timeline.truncate(0)
+        self._size = 0
+
+    def step(self, index):
+        """(name, theta) of the active gate at index."""
+        if index < 0:
+            index += self._size
+        if not 0 <= index < self._size:
+            raise IndexError('gate index out of range')
+        return self._steps[index]
+
+    @property
+    def gates(self):
+        """The active gates as a GateSequence (usable with animation.circuit_frames)."""
+        return self._steps[:self._size]
+
+    def unitary(self, k=None):
+        """Product of the first k gates (all active gates by default), as a new array."""
+        k = self._size if k is None else k
+        if not 0 <= k <= self._size:
+            raise IndexError('step out of range')
+        return self._timeline.unitary(k)
+
+    def product(self, start=0, stop=None):
+        """Net unitary of the active gates start..stop-1."""
+        stop = self._size if stop is None else stop
+        if not 0 <= start <= stop <= self._size:
+            raise IndexError('gate range out of range')
+        return self._timeline.product(start, stop)
+
+    def state(self, k=None):
+        """State after the first k gates, starting from |0>."""
+        return self.unitary(k)[:, 0].copy()
+
+    def bloch_vector(self, k=None):
+        return bloch.bloch_vector(self.unitary(k)[:, 0])
+
+
+def apply_step(circuit, name, theta=None, qubit=0):
+    """Apply one (name, theta) gate to a Qiskit-style circuit, e.g. circuit.rx(theta, qubit)."""
+    method = getattr(circuit, name)
+    if theta is None:
+        method(qubit)
+    else:
+        method(theta, qubit)
@@ -0,0 +1,27 @@
+#deferred loading of heavy libraries so the Tk window appears first
+import importlib
+import threading
+
+# Modules the Qiskit-based apps need once the user starts working
+QISKIT_MODULES = ('numpy', 'matplotlib.pyplot', 'matplotlib.backends.backend_tkagg',
+                  'qiskit', 'qiskit_aer', 'qiskit.visualization')
+
+
+def _import_all(names):
+    for name in names:
+        try:
+            importlib.import_module(name)
+        except ImportError:
+            # Reported by the regular import when the module is actually used
+            pass
+
+
+def preload(names=QISKIT_MODULES):
+    """Import modules on a background thread and return the thread.
+
+    A later regular import of one of them waits for (or reuses) the
+    background import instead of starting from scratch.
+    """
+    thread = threading.Thread(target=_import_all, args=(tuple(names),), daemon=True)
+    thread.start()
+    return thread
@@ -0,0 +1,77 @@
+#shot sampling: measurement counts drawn from a statevector in one vectorized call
+"""Simulated measurements in the computational basis.
+
+The outcome probabilities are computed once from the state and all shots
+are drawn with a single multinomial call, so a million shots cost about
+as much as one. States are NumPy arrays or anything convertible to one,
+such as a Qiskit Statevector; they are never modified.
+
+rng may be a numpy Generator or a seed for reproducible results.
+Bitstrings follow the Qiskit convention: qubit 0 is the rightmost bit.
+"""
+import numpy as np
+
+DEFAULT_SHOTS = 1024
+
+
+def probabilities(state):
+    """Probability of every basis state, renormalized against rounding."""
+    p = np.abs(np.asarray(state, dtype=complex).ravel()) ** 2
+    return p / p.sum()
+
+
+def num_qubits(state):
+    size = np.asarray(state).size
+    n = size.bit_length() - 1
+    if size != 1 << n:
+        raise ValueError(f'State of length {size} is not a qubit register')
+    return n
+
+
+def labels(indices, n):
+    """Bitstrings of the given basis state indices of an n-qubit register."""
+    return np.array([format(index, f'0{n}b') for index in np.asarray(indices).tolist()])
+
+
+def sample_counts(state, shots=DEFAULT_SHOTS, rng=None):
+    """Number of times each basis state is measured over shots, as an int array."""
+    rng = np.random.default_rng(rng)
+    return rng.multinomial(shots, probabilities(state))
+
+
+def counts(state, shots=DEFAULT_SHOTS, rng=None):
+    """Measurement counts as a {bitstring: count} dict of the observed outcomes."""
+    sampled = sample_counts(state, shots, rng)
+    observed = np.flatnonzero(sampled)
+    names = labels(observed, num_qubits(state))
+    return {str(name): int(sampled[index]) for name, index in zip(names, observed)}
+
+
+def sample_bitstrings(state, shots=DEFAULT_SHOTS, rng=None):
+    """The outcome of every shot, in measurement order, as an array of bitstrings."""
+    rng = np.random.default_rng(rng)
+    sampled = sample_counts(state, shots, rng)
+    observed = np.flatnonzero(sampled)
+    # Label only the outcomes that occurred, then shuffle them into shot order
+    outcomes = rng.permutation(np.repeat(np.arange(len(observed)), sampled[observed]))
+    return labels(observed, num_qubits(state))[outcomes]
+
+
+def histogram(counts, ax=None, title=None):
+    """Bar chart of a counts dict as a Matplotlib figure."""
+    import matplotlib.pyplot as plt
+
+    if ax is None:
+        fig, ax = plt.subplots(figsize=(7, 5))
+    else:
+        fig = ax.figure
+    names = sorted(counts)
+    values = np.array([counts[name] for name in names])
+    shots = values.sum()
+    bars = ax.bar(names, values / shots if shots else values, color='#648fff')
+    for bar, value in zip(bars, values):
+        ax.annotate(str(value), (bar.get_x() + bar.get_width() / 2, bar.get_height()),
+                    ha='center', va='bottom')
+    ax.set_ylabel('Probability')
+    ax.set_title(title or f'{shots} shots')
+    return fig
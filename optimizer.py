@@ -0,0 +1,108 @@
+#peephole optimizer for single-qubit gate sequences
+"""Shorten a gate sequence before it is simulated or animated.
+
+Adjacent gates about the same axis are merged (X, RX / Y, RY / Z, S, T,
+SD, TD, RZ), inverse pairs and full turns cancel, H H cancels and the
+merged Z rotations are rewritten to a canonical Clifford+T form. The
+result is equal to the input up to a global phase, which the Bloch sphere
+does not show.
+"""
+import numpy as np
+
+from sequence import GateSequence
+
+# Rotation angle of every gate that is a rotation about a coordinate axis
+_AXIS_GATES = {
+    'x': ('x', np.pi),
+    'rx': ('x', None),
+    'y': ('y', np.pi),
+    'ry': ('y', None),
+    'z': ('z', np.pi),
+    's': ('z', np.pi / 2),
+    'sdg': ('z', -np.pi / 2),
+    't': ('z', np.pi / 4),
+    'tdg': ('z', -np.pi / 4),
+    'rz': ('z', None),
+}
+
+# Canonical Clifford+T gates for Z rotations by k * PI/4
+_Z_CANONICAL = {
+    0: (),
+    1: ('t',),
+    2: ('s',),
+    3: ('s', 't'),
+    4: ('z',),
+    5: ('z', 't'),
+    6: ('sdg',),
+    7: ('tdg',),
+}
+
+ATOL = 1e-9
+
+
+def _wrap(angle):
+    """Angle in (-PI, PI]; a full turn is the identity on the Bloch sphere."""
+    if -np.pi < angle <= np.pi:
+        return angle
+    angle = np.remainder(angle + np.pi, 2 * np.pi) - np.pi
+    return np.pi if angle <= -np.pi + ATOL else angle
+
+
+def _canonical(axis, angle, fixed):
+    """Gates for a rotation by angle about axis.
+
+    Runs made only of fixed gates are written in Clifford+T form. Runs
+    that contained an explicit rotation stay a single rotation, unless
+    they add up to a single fixed gate.
+    """
+    eighths = angle / (np.pi / 4)
+    if fixed or abs(eighths - round(eighths)) < ATOL:
+        k = int(round(eighths)) % 8
+        if axis == 'z':
+            canonical = [(name, None) for name in _Z_CANONICAL[k]]
+        elif k in (0, 4):
+            canonical = [(axis, None)] if k == 4 else []
+        else:
+            canonical = None
+        if canonical is not None and (fixed or len(canonical) <= 1):
+            return canonical
+    return [('r' + axis, float(angle))]
+
+
+def optimize(steps):
+    """Optimize a sequence of (name, theta) gates.
+
+    Returns (GateSequence, removed) where removed is how many gates
+    shorter the result is.
+    """
+    # Stack of ('h', None, True) entries and (axis, accumulated angle, fixed gates only) runs
+    stack = []
+    count = 0
+    for name, theta in steps:
+        count += 1
+        if name == 'id':
+            continue
+        if name == 'h':
+            if stack and stack[-1][0] == 'h':
+                stack.pop()
+            else:
+                stack.append(('h', None, True))
+            continue
+        axis, angle = _AXIS_GATES[name]
+        fixed = angle is not None
+        angle = angle if fixed else theta
+        if stack and stack[-1][0] == axis:
+            _, previous, previous_fixed = stack.pop()
+            angle += previous
+            fixed = fixed and previous_fixed
+        angle = _wrap(angle)
+        if abs(angle) > ATOL:
+            stack.append((axis, angle, fixed))
+
+    optimized = GateSequence()
+    for axis, angle, fixed in stack:
+        if axis == 'h':
+            optimized.append('h')
+        else:
+            optimized.extend(_canonical(axis, angle, fixed))
+    return optimized, count - len(optimized)
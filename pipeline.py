@@ -0,0 +1,77 @@
+#lazy gate-stream pipeline: parse -> compile -> apply -> emit Bloch vectors
+"""Generator stages for streaming gate sequences through the simulator.
+
+Every stage consumes an iterator and yields one item per gate, so a
+sequence of any length is processed in constant memory:
+
+    vectors = emit_bloch(apply(compile_gates(parse(tokenize(lines)))))
+"""
+import numpy as np
+
+import bloch
+import gates
+
+# Tokens drawn by random_tokens
+RANDOM_TOKENS = ('X', 'Y', 'Z', 'H', 'S', 'SD', 'T', 'TD')
+
+
+def tokenize(lines):
+    """Split lines of text into gate tokens."""
+    for line in lines:
+        yield from line.split()
+
+
+def parse(tokens, strict=True):
+    """Turn gate tokens into (name, theta) pairs; see gates.parse_gate.
+
+    Unknown tokens raise ValueError, or are skipped when strict is False.
+    """
+    for token in tokens:
+        try:
+            yield gates.parse_gate(token)
+        except ValueError:
+            if strict:
+                raise
+
+
+def compile_gates(steps):
+    """Look up the 2x2 matrix of every (name, theta) pair."""
+    for name, theta in steps:
+        yield gates.gate(name, theta)
+
+
+def apply(matrices, state=None):
+    """Apply gate matrices one after another, yielding the state after each."""
+    state = np.array([1, 0], dtype=complex) if state is None else np.array(state, dtype=complex).reshape(2)
+    for matrix in matrices:
+        state = matrix @ state
+        yield state
+
+
+def emit_bloch(states):
+    """Bloch vector of every state."""
+    for state in states:
+        yield bloch.bloch_vector(state)
+
+
+def bloch_stream(tokens, state=None, strict=True):
+    """Bloch vector after every gate token, computed lazily."""
+    return emit_bloch(apply(compile_gates(parse(tokens, strict)), state))
+
+
+def final_state(tokens, state=None, strict=True):
+    """State after all gate tokens without keeping any intermediate."""
+    state = np.array([1, 0], dtype=complex) if state is None else state
+    for state in apply(compile_gates(parse(tokens, strict)), state):
+        pass
+    return state
+
+
+def random_tokens(count, rng=None, tokens=RANDOM_TOKENS):
+    """Yield count gate tokens drawn uniformly from tokens, in blocks."""
+    rng = rng or np.random.default_rng()
+    block = 4096
+    while count > 0:
+        for index in rng.integers(len(tokens), size=min(block, count)):
+            yield tokens[index]
+        count -= block
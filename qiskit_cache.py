@@ -0,0 +1,120 @@
+#content-addressed LRU cache for Qiskit transpile and statevector results
+"""Memoize transpile() and statevector simulation per circuit content.
+
+Circuits are keyed by a hash of their instructions, so an unchanged (or
+rebuilt identical) circuit never goes through transpile or Aer twice.
+Cached circuits and statevectors are shared: do not mutate them.
+"""
+from collections import OrderedDict
+import hashlib
+import threading
+
+
+class LRUCache:
+    """Mapping with a size bound that evicts the least recently used entry.
+
+    Safe to share between threads, e.g. the TkWorker threads of the apps.
+    """
+
+    def __init__(self, maxsize=64):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            if key in self._data:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return self._data[key]
+            self.misses += 1
+            return default
+
+    def put(self, key, value):
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __contains__(self, key):
+        with self._lock:
+            return key in self._data
+
+    def __len__(self):
+        with self._lock:
+            return len(self._data)
+
+
+transpiled_cache = LRUCache(maxsize=64)
+statevector_cache = LRUCache(maxsize=256)
+
+
+def _param_key(param):
+    try:
+        return repr(float(param))
+    except (TypeError, ValueError):
+        # Unbound parameters and other non-numeric arguments
+        return str(param)
+
+
+def _backend_name(backend):
+    if backend is None:
+        return ''
+    name = getattr(backend, 'name', '')
+    return name() if callable(name) else str(name)
+
+
+def circuit_key(circuit, backend=None):
+    """Stable content hash of a circuit (and the backend it targets)."""
+    digest = hashlib.sha256()
+    digest.update(f'{_backend_name(backend)}|{circuit.num_qubits}|{circuit.num_clbits}'
+                  f'|{_param_key(circuit.global_phase)}'.encode())
+    for instruction in circuit.data:
+        operation = instruction.operation
+        qubits = ','.join(str(circuit.find_bit(qubit).index) for qubit in instruction.qubits)
+        clbits = ','.join(str(circuit.find_bit(clbit).index) for clbit in instruction.clbits)
+        params = ','.join(_param_key(param) for param in operation.params)
+        digest.update(f';{operation.name}({params})[{qubits}][{clbits}]'.encode())
+    return digest.hexdigest()
+
+
+def cached_transpile(circuit, backend):
+    """transpile(circuit, backend), reusing the result for identical circuits."""
+    key = circuit_key(circuit, backend)
+    transpiled = transpiled_cache.get(key)
+    if transpiled is None:
+        from qiskit import transpile
+        transpiled = transpile(circuit, backend)
+        transpiled_cache.put(key, transpiled)
+    return transpiled
+
+
+def cached_statevector(circuit, simulator):
+    """Final statevector of circuit on an Aer simulator, cached per circuit.
+
+    The statevector is saved on a copy of the circuit, so the caller's
+    circuit is left untouched.
+    """
+    key = circuit_key(circuit, simulator)
+    state_vector = statevector_cache.get(key)
+    if state_vector is None:
+        import qiskit_aer  # noqa: F401  registers QuantumCircuit.save_statevector
+        to_run = circuit.copy()
+        to_run.save_statevector()
+        result = simulator.run(cached_transpile(to_run, simulator)).result()
+        state_vector = result.get_statevector()
+        statevector_cache.put(key, state_vector)
+    return state_vector
+
+
+def clear():
+    """Drop every cached transpiled circuit and statevector."""
+    transpiled_cache.clear()
+    statevector_cache.clear()
@@ -6,8 +6,19 @@ import numpy as np
 import matplotlib.pyplot as plt
 from mpl_toolkits.mplot3d import Axes3D
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+from matplotlib.figure import Figure
 from matplotlib.widgets import Button as mplButton
 
+import bloch
+import dialogs
+import gates
+import measurement
+import optimizer
+import quaternion
+import worker
+from sequence import GateSequence
+from timeline import Timeline
+
 # UI appearance settings
 BG_COLOR = '#2c94c5'
 BTN_COLOR = '#834550'
@@ -17,106 +28,140 @@ DISPLAY_FONT = ('Arial', 32)
 
 
 class QuantumCircuit:
+    __slots__ = ('num_qubits', 'initial_state', 'state', 'gates', '_timeline', '_indexed')
+
     def __init__(self, num_qubits):
         self.num_qubits = num_qubits
-        self.state = np.array([1, 0], dtype=complex)  # Initial state |0>
-        self.gates = []
+        # Read-only state the gates act on; state holds the result of apply_gates
+        self.initial_state = np.array([1, 0], dtype=complex)  # Initial state |0>
+        self.initial_state.setflags(write=False)
+        self.state = self.initial_state.copy()
+        self.gates = GateSequence()
+        # Cumulative products of the gates indexed so far, see timeline()
+        self._timeline = Timeline()
+        # (gate list, generation) the timeline was built from
+        self._indexed = (self.gates, self.gates.generation)
 
     def x(self):
-        self.gates.append(self._x_gate)
+        self.gates.append('x')
 
     def y(self):
-        self.gates.append(self._y_gate)
+        self.gates.append('y')
 
     def z(self):
-        self.gates.append(self._z_gate)
+        self.gates.append('z')
 
     def h(self):
-        self.gates.append(self._h_gate)
+        self.gates.append('h')
 
     def s(self):
-        self.gates.append(self._s_gate)
+        self.gates.append('s')
 
     def sdg(self):
-        self.gates.append(self._sdg_gate)
+        self.gates.append('sdg')
 
     def t(self):
-        self.gates.append(self._t_gate)
+        self.gates.append('t')
 
     def tdg(self):
-        self.gates.append(self._tdg_gate)
+        self.gates.append('tdg')
 
     def rx(self, theta):
-        self.gates.append(lambda: self._rx_gate(theta))
+        self.gates.append('rx', theta)
 
     def ry(self, theta):
-        self.gates.append(lambda: self._ry_gate(theta))
+        self.gates.append('ry', theta)
 
     def rz(self, theta):
-        self.gates.append(lambda: self._rz_gate(theta))
-
-    def apply_gates(self):
-        for gate in self.gates:
-            self.state = gate() @ self.state
-
-    def _x_gate(self):
-        return np.array([[0, 1], [1, 0]], dtype=complex)
-
-    def _y_gate(self):
-        return np.array([[0, -1j], [1j, 0]], dtype=complex)
-
-    def _z_gate(self):
-        return np.array([[1, 0], [0, -1]], dtype=complex)
-
-    def _h_gate(self):
-        return np.array([[1, 1], [1, -1]], dtype=complex) / np.sqrt(2)
-
-    def _s_gate(self):
-        return np.array([[1, 0], [0, 1j]], dtype=complex)
+        self.gates.append('rz', theta)
 
-    def _sdg_gate(self):
-        return np.array([[1, 0], [0, -1j]], dtype=complex)
+    def timeline(self):
+        """Prefix and range products of the gate list (see timeline.Timeline).
 
-    def _t_gate(self):
-        return np.array([[1, 0], [0, np.exp(1j * np.pi / 4)]], dtype=complex)
-
-    def _tdg_gate(self):
-        return np.array([[1, 0], [0, np.exp(-1j * np.pi / 4)]], dtype=complex)
-
-    def _rx_gate(self, theta):
-        return np.array([[np.cos(theta / 2), -1j * np.sin(theta / 2)],
-                         [-1j * np.sin(theta / 2), np.cos(theta / 2)]], dtype=complex)
-
-    def _ry_gate(self, theta):
-        return np.array([[np.cos(theta / 2), -np.sin(theta / 2)],
-                         [np.sin(theta / 2), np.cos(theta / 2)]], dtype=complex)
-
-    def _rz_gate(self, theta):
-        return np.array([[np.exp(-1j * theta / 2), 0],
-                         [0, np.exp(1j * theta / 2)]], dtype=complex)
-
-    def measure(self):
-        probabilities = np.abs(self.state) ** 2
-        return np.random.choice([0, 1], p=probabilities)
+        Only gates appended since the last call are indexed, so keeping
+        the timeline of a growing circuit current costs one matmul per
+        new gate.
+        """
+        indexed, generation = self._indexed
+        if indexed is not self.gates or generation != self.gates.generation:
+            # Gates were removed or the gate list was replaced; start over
+            self._timeline.truncate(0)
+            self._indexed = (self.gates, self.gates.generation)
+        self._timeline.extend(self.gates[len(self._timeline):].matrices())
+        return self._timeline
+
+    def compile(self):
+        """Fold the gate list into a single cached 2x2 unitary."""
+        return self.timeline().unitary()
+
+    def state_at(self, k=None):
+        """State after the first k gates, without replaying them."""
+        return self.timeline().state(k, self.initial_state)
+
+    def product(self, start=0, stop=None):
+        """Net unitary of gates start..stop-1."""
+        return self.timeline().product(start, stop)
+
+    def apply_gates(self, compiled=False):
+        """Set state to the result of all gates acting on the initial state."""
+        if compiled:
+            self.state = self.compile() @ self.initial_state
+            return
+        state = self.initial_state
+        for name, theta in self.gates:
+            state = gates.gate(name, theta) @ state
+        self.state = state
+
+    def optimize(self):
+        """Replace the gate list by its peephole-optimized form.
+
+        Returns the number of gates removed. The result is equal up to a
+        global phase.
+        """
+        self.gates, removed = optimizer.optimize(self.gates)
+        return removed
+
+    def to_quaternion(self):
+        """Net rotation of the circuit on the Bloch sphere as a unit quaternion."""
+        return quaternion.from_unitary(self.compile())
+
+    def from_quaternion(self, q):
+        """Append the rotation described by a quaternion as rz, ry, rz gates."""
+        alpha, beta, gamma = quaternion.to_euler_zyz(q)
+        self.rz(gamma)
+        self.ry(beta)
+        self.rz(alpha)
+
+    def to_bytes(self):
+        """Serialize the gate list; see GateSequence.to_bytes."""
+        return self.gates.to_bytes()
+
+    @classmethod
+    def from_bytes(cls, data, num_qubits=1):
+        circuit = cls(num_qubits)
+        circuit.gates = GateSequence.from_bytes(data)
+        return circuit
+
+    def measure(self, shots=None, rng=None):
+        """Measure the state after all gates without collapsing it.
+
+        Returns a single outcome (0 or 1), or a {bitstring: count} dict
+        when shots is given. rng is a numpy Generator or a seed.
+        """
+        state = self.state_at()
+        if shots is None:
+            return int(np.argmax(measurement.sample_counts(state, 1, rng)))
+        return measurement.counts(state, shots, rng)
 
 
 def bloch_sphere(state):
     fig = plt.figure()
     ax = fig.add_subplot(111, projection='3d')
 
-    u = np.linspace(0, 2 * np.pi, 100)
-    v = np.linspace(0, np.pi, 100)
-    x = np.outer(np.cos(u), np.sin(v))
-    y = np.outer(np.sin(u), np.sin(v))
-    z = np.outer(np.ones(np.size(u)), np.cos(v))
-    ax.plot_surface(x, y, z, color='b', alpha=0.1)
-
-    rho = np.outer(state, state.conj())
-    x_bloch = 2 * np.real(rho[0, 1])
-    y_bloch = 2 * np.imag(rho[1, 0])
-    z_bloch = 1 - 2 * np.real(rho[1, 1])
+    x_bloch, y_bloch, z_bloch = bloch.bloch_vector(state)
 
-    ax.quiver(0, 0, 0, x_bloch, y_bloch, z_bloch, color='r', arrow_length_ratio=0.1)
+    arrow = ax.quiver(0, 0, 0, x_bloch, y_bloch, z_bloch, color='r', arrow_length_ratio=0.1, animated=True)
+    fig.sphere_background = bloch.SphereBackground(ax, [arrow])
 
     ax.set_xlabel('X')
     ax.set_ylabel('Y')
@@ -124,25 +169,22 @@ def bloch_sphere(state):
     plt.show()
 
 
+def step_vectors(steps, initial_state):
+    """(N+1,3) Bloch vectors after every prefix of a GateSequence."""
+    return bloch.bloch_vector(Timeline(steps.matrices()).states(initial_state))
+
+
 class QuantumVisualizer:
     """Primary class for the Quantum Visualizer application."""
 
     def __init__(self):
         self.visualization_window = None
+        self.step_vectors = None
+        self.dialogs = None
+        self.worker = None
 
-    @staticmethod
-    def show_about():
+    def show_about(self):
         """Display project information."""
-        about_window = tk.Tk()
-        about_window.title('About')
-        about_window.geometry('650x470')
-
-        info_label = tk.Label(about_window, text="About Quantum Visualizer:", font=("Arial", 14))
-        info_label.pack()
-
-        text_widget = tk.Text(about_window, height=20, width=20)
-        text_widget.pack(fill='both', expand=True)
-
         info_text = """
         About: Visualization tool for Single Qubit Rotation on Bloch Sphere
         BY:Team ÅvinyÅ 
@@ -164,15 +206,12 @@ class QuantumVisualizer:
         Allowed range for theta (rotation_angle) in the app is [-2*PI, 2*PI]
 
         If visualization fails, the app closes automatically.
-        Only ten operations can be visualized at a time.
         """
-        text_widget.insert(END, info_text)
-
-        about_window.mainloop()
+        self.dialogs.about(info_text, heading="About Quantum Visualizer:")
 
     @staticmethod
-    def set_theta(num, window, circuit, key):
-        """Set theta value and close the input window."""
+    def set_theta(num, circuit, key):
+        """Set theta value and apply the rotation."""
         theta = num * np.pi
         if key == 'x':
             circuit.rx(theta)
@@ -180,30 +219,12 @@ class QuantumVisualizer:
             circuit.ry(theta)
         else:
             circuit.rz(theta)
-        window.destroy()
 
     def get_theta(self, circuit, key):
         """Prompt user to input rotation angle for Rx, Ry, Rz gates."""
-        input_window = tk.Tk()
-        input_window.title('Input Theta')
-        input_window.geometry('360x160')
-        input_window.resizable(0, 0)
-
-        btns = [
-            ('PI/4', 0.25), ('PI/2', 0.50), ('PI', 1.0), ('2*PI', 2.0),
-            ('-PI/4', -0.25), ('-PI/2', -0.50), ('-PI', -1.0), ('-2*PI', -2.0)
-        ]
-
-        for idx, (text, val) in enumerate(btns):
-            btn = tk.Button(input_window, height=2, width=10, bg=BTN_COLOR, font=("Arial", 10), text=text,
-                            command=lambda v=val: self.set_theta(v, input_window, circuit, key))
-            btn.grid(row=idx // 4, column=idx % 4, padx=5, pady=5)
-
-        note_text = tk.Text(input_window, height=2, width=35, bg="light cyan")
-        note_text.insert(END, "Provide the value for theta\nRange: [-2*PI, 2*PI]")
-        note_text.grid(row=2, columnspan=4, pady=10)
-
-        input_window.mainloop()
+        # Preview from the state Visualize would show after the last gate
+        self.dialogs.ask_theta(lambda num: self.set_theta(num, circuit, key), button_color=BTN_COLOR,
+                               state=circuit.state_at(), axis=key)
 
     def visualize(self, circuit):
         """Visualize the quantum circuit's single qubit rotations."""
@@ -217,38 +238,61 @@ class QuantumVisualizer:
         vis_frame.pack(fill='both', expand=True)
 
         try:
-            fig = plt.figure()
-            ax = fig.add_subplot(111, projection='3d')
-
-            u = np.linspace(0, 2 * np.pi, 100)
-            v = np.linspace(0, np.pi, 100)
-            x = np.outer(np.cos(u), np.sin(v))
-            y = np.outer(np.sin(u), np.sin(v))
-            z = np.outer(np.ones(np.size(u)), np.cos(v))
-            ax.plot_surface(x, y, z, color='b', alpha=0.1)
-
-            circuit.apply_gates()
-            state = circuit.state
-            rho = np.outer(state, state.conj())
-            x_bloch = 2 * np.real(rho[0, 1])
-            y_bloch = 2 * np.imag(rho[1, 0])
-            z_bloch = 1 - 2 * np.real(rho[1, 1])
-
-            ax.quiver(0, 0, 0, x_bloch, y_bloch, z_bloch, color='r', arrow_length_ratio=0.1)
-            ax.set_xlabel('X')
-            ax.set_ylabel('Y')
-            ax.set_zlabel('Z')
-
+            fig = Figure()
             canvas = FigureCanvasTkAgg(fig, master=vis_frame)
+            self.ax = fig.add_subplot(111, projection='3d')
+            self.ax.set_xlabel('X')
+            self.ax.set_ylabel('Y')
+            self.ax.set_zlabel('Z')
+            self.arrow = self.ax.quiver(0, 0, 0, *bloch.bloch_vector(circuit.initial_state), color='r',
+                                        arrow_length_ratio=0.1, animated=True)
+            # The sphere is rasterized once; moving the arrow only blits it over the saved bitmap
+            self.sphere_background = bloch.SphereBackground(self.ax, [self.arrow])
             canvas.draw()
             canvas.get_tk_widget().pack(fill='both', expand=True)
         except Exception as e:
-            print(f"Visualization failed: {e}")
+            self.visualization_failed(e)
+            return
+
+        # Dragging the timeline jumps to the state after any gate; the vector of every
+        # step is computed once on a worker thread from a snapshot of the gates
+        self.step_vectors = None
+        self.scrub = dialogs.Coalescer(self.visualization_window, self.show_step)
+        self.timeline_scale = tk.Scale(vis_frame, from_=0, to=len(circuit.gates), orient=tk.HORIZONTAL,
+                                       label='Gates applied', state=tk.DISABLED,
+                                       command=lambda value: self.scrub.submit(int(value)))
+        self.timeline_scale.pack(fill='x', padx=10)
+        self.worker.submit('visualize', step_vectors, circuit.gates[:], circuit.initial_state,
+                           on_done=self.show_steps, on_error=self.visualization_failed)
+
+    def show_steps(self, vectors):
+        if not self.timeline_scale.winfo_exists():
+            return
+        self.step_vectors = vectors
+        self.timeline_scale.config(state=tk.NORMAL)
+        self.timeline_scale.set(len(vectors) - 1)
+        self.show_step(len(vectors) - 1)
+
+    def show_step(self, k):
+        """Point the arrow at the Bloch vector after the first k gates."""
+        if self.step_vectors is None or not self.timeline_scale.winfo_exists():
+            return
+        self.arrow.remove()
+        self.arrow = self.ax.quiver(0, 0, 0, *self.step_vectors[k], color='r', arrow_length_ratio=0.1,
+                                    animated=True)
+        self.sphere_background.artists = [self.arrow]
+        self.sphere_background.blit()
+
+    def visualization_failed(self, error):
+        print(f"Visualization failed: {error}")
+        if self.visualization_window.winfo_exists():
             self.visualization_window.destroy()
 
     def main(self, testing=False):
         """Run the main Quantum Visualizer application."""
         root = tk.Tk()
+        self.dialogs = dialogs.DialogManager(root)
+        self.worker = worker.TkWorker(root)
         root.geometry('650x700')
         root.resizable(0, 0)
         root.configure(bg=BG_COLOR)
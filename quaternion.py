@@ -0,0 +1,183 @@
+#single-qubit gates as unit quaternions (SU(2) -> SO(3) rotations of the Bloch sphere)
+import numpy as np
+
+import gates
+
+# Quaternions are stored as float arrays [w, x, y, z]
+IDENTITY = np.array([1.0, 0.0, 0.0, 0.0])
+
+
+def normalize(q):
+    """Scale q to unit length and pick the representative with w >= 0."""
+    q = np.asarray(q, dtype=float)
+    q = q / np.linalg.norm(q, axis=-1, keepdims=True)
+    return np.where(q[..., :1] < 0, -q, q)
+
+
+def from_axis_angle(axis, angle):
+    """Quaternion rotating the Bloch sphere by angle about axis."""
+    axis = np.asarray(axis, dtype=float)
+    axis = axis / np.linalg.norm(axis)
+    return np.concatenate(([np.cos(angle / 2)], np.sin(angle / 2) * axis))
+
+
+def to_axis_angle(q):
+    """Inverse of from_axis_angle; the axis is +z for the identity."""
+    q = normalize(q)
+    angle = 2 * np.arctan2(np.linalg.norm(q[1:]), q[0])
+    norm = np.linalg.norm(q[1:])
+    axis = q[1:] / norm if norm > 1e-12 else np.array([0.0, 0.0, 1.0])
+    return axis, angle
+
+
+def from_unitary(matrix):
+    """Quaternion of a 2x2 unitary, discarding its global phase.
+
+    U = e^(i phi) (w I - i (x X + y Y + z Z)) rotates the Bloch sphere by
+    the quaternion [w, x, y, z].
+    """
+    matrix = np.asarray(matrix, dtype=complex)
+    v = matrix / np.sqrt(np.linalg.det(matrix))
+    w = (v[0, 0] + v[1, 1]).real / 2
+    x = -(v[0, 1] + v[1, 0]).imag / 2
+    y = (v[1, 0] - v[0, 1]).real / 2
+    z = (v[1, 1] - v[0, 0]).imag / 2
+    return normalize([w, x, y, z])
+
+
+def to_unitary(q):
+    """SU(2) matrix of a quaternion, usable as a QuantumCircuit gate."""
+    w, x, y, z = q
+    return np.array([[w - 1j * z, -y - 1j * x],
+                     [y - 1j * x, w + 1j * z]], dtype=complex)
+
+
+def to_euler_zyz(q):
+    """Angles (alpha, beta, gamma) with rz(alpha) ry(beta) rz(gamma) equal to q.
+
+    The circuit applies rz(gamma) first, then ry(beta), then rz(alpha).
+    """
+    v = to_unitary(q)
+    beta = 2 * np.arctan2(abs(v[1, 0]), abs(v[0, 0]))
+    total = 2 * np.angle(v[1, 1])
+    difference = 2 * np.angle(v[1, 0])
+    return (total + difference) / 2, beta, (total - difference) / 2
+
+
+def to_rotation_matrix(q):
+    """3x3 real rotation acting on Bloch vectors."""
+    w, x, y, z = q
+    return np.array([
+        [1 - 2 * (y * y + z * z), 2 * (x * y - w * z), 2 * (x * z + w * y)],
+        [2 * (x * y + w * z), 1 - 2 * (x * x + z * z), 2 * (y * z - w * x)],
+        [2 * (x * z - w * y), 2 * (y * z + w * x), 1 - 2 * (x * x + y * y)],
+    ])
+
+
+def multiply(q1, q2):
+    """Hamilton product q1 * q2, i.e. rotate by q2 first and then by q1."""
+    w1, x1, y1, z1 = q1
+    w2, x2, y2, z2 = q2
+    return np.array([
+        w1 * w2 - x1 * x2 - y1 * y2 - z1 * z2,
+        w1 * x2 + x1 * w2 + y1 * z2 - z1 * y2,
+        w1 * y2 - x1 * z2 + y1 * w2 + z1 * x2,
+        w1 * z2 + x1 * y2 - y1 * x2 + z1 * w2,
+    ])
+
+
+def conjugate(q):
+    return np.array([q[0], -q[1], -q[2], -q[3]])
+
+
+def rotate(q, vectors):
+    """Rotate a Bloch vector (3,) or a batch (N,3) by q."""
+    vectors = np.asarray(vectors, dtype=float)
+    w = q[0]
+    u = np.asarray(q[1:], dtype=float)
+    t = 2 * np.cross(u, vectors)
+    return vectors + w * t + np.cross(u, t)
+
+
+def slerp(q0, q1, t):
+    """Spherical interpolation from q0 (t=0) to q1 (t=1); t may be an array."""
+    q0 = np.asarray(q0, dtype=float)
+    q1 = np.asarray(q1, dtype=float)
+    dot = np.dot(q0, q1)
+    if dot < 0:
+        # Take the short way round
+        q1 = -q1
+        dot = -dot
+    t = np.asarray(t, dtype=float)[..., None]
+    if dot > 0.9995:
+        return normalize(q0 + t * (q1 - q0))
+    omega = np.arccos(dot)
+    return (np.sin((1 - t) * omega) * q0 + np.sin(t * omega) * q1) / np.sin(omega)
+
+
+def gate_quaternion(name, theta=None):
+    """Quaternion of a named gate, e.g. gate_quaternion('rx', np.pi / 2)."""
+    if name in ('rx', 'ry', 'rz'):
+        axis = {'x': (1, 0, 0), 'y': (0, 1, 0), 'z': (0, 0, 1)}[name[1]]
+        return from_axis_angle(axis, theta)
+    return _FIXED[name]
+
+
+_FIXED = {name: from_unitary(matrix) for name, matrix in gates.GATES.items()}
+
+
+class QuaternionCircuit:
+    """Single-qubit engine that composes gates as quaternions.
+
+    Mirrors the gate methods of quantum_glasses.QuantumCircuit but keeps
+    only the accumulated rotation, which is applied to Bloch vectors directly.
+    """
+
+    __slots__ = ('rotation',)
+
+    def __init__(self):
+        self.rotation = IDENTITY.copy()
+
+    def apply(self, q):
+        self.rotation = normalize(multiply(q, self.rotation))
+
+    def x(self):
+        self.apply(_FIXED['x'])
+
+    def y(self):
+        self.apply(_FIXED['y'])
+
+    def z(self):
+        self.apply(_FIXED['z'])
+
+    def h(self):
+        self.apply(_FIXED['h'])
+
+    def s(self):
+        self.apply(_FIXED['s'])
+
+    def sdg(self):
+        self.apply(_FIXED['sdg'])
+
+    def t(self):
+        self.apply(_FIXED['t'])
+
+    def tdg(self):
+        self.apply(_FIXED['tdg'])
+
+    def rx(self, theta):
+        self.apply(gate_quaternion('rx', theta))
+
+    def ry(self, theta):
+        self.apply(gate_quaternion('ry', theta))
+
+    def rz(self, theta):
+        self.apply(gate_quaternion('rz', theta))
+
+    def unitary(self):
+        """The accumulated rotation as a 2x2 SU(2) matrix."""
+        return to_unitary(self.rotation)
+
+    def bloch_vector(self, start=(0, 0, 1)):
+        """Bloch vector reached from start (|0> by default)."""
+        return rotate(self.rotation, start)
@@ -0,0 +1,192 @@
+#compact gate-sequence storage: one uint8 opcode and one float64 angle per gate
+import hashlib
+import struct
+import numpy as np
+
+import gates
+
+# Opcode of every gate; rotations are the only ones whose angle is used
+OPCODES = {
+    'id': 0,
+    'x': 1,
+    'y': 2,
+    'z': 3,
+    'h': 4,
+    's': 5,
+    'sdg': 6,
+    't': 7,
+    'tdg': 8,
+    'rx': 9,
+    'ry': 10,
+    'rz': 11,
+}
+NAMES = tuple(sorted(OPCODES, key=OPCODES.get))
+ROTATIONS = frozenset(OPCODES[name] for name in ('rx', 'ry', 'rz'))
+
+# Matrix of every fixed gate indexed by opcode; the rotation rows are filled per angle
+_FIXED_MATRICES = np.array([gates.GATES.get(name, gates.I) for name in NAMES])
+
+_HEADER = struct.Struct('<4sI')
+_MAGIC = b'GSQ1'
+
+
+class GateSequence:
+    """Growable list of (name, theta) gates backed by two NumPy arrays.
+
+    Each gate takes 9 bytes: a uint8 opcode and a float64 angle (0 for
+    the fixed gates). Capacity doubles when full, so appends are amortized
+    O(1). Iterating yields (name, theta) pairs, theta being None for the
+    fixed gates, as expected by gates.gate and the pipeline module.
+    """
+
+    __slots__ = ('_opcodes', '_angles', '_size', '_generation')
+
+    def __init__(self, steps=(), capacity=16):
+        self._opcodes = np.empty(capacity, dtype=np.uint8)
+        self._angles = np.empty(capacity, dtype=np.float64)
+        self._size = 0
+        self._generation = 0
+        self.extend(steps)
+
+    def _grow(self, needed):
+        capacity = max(needed, 2 * len(self._opcodes), 16)
+        opcodes = np.empty(capacity, dtype=np.uint8)
+        angles = np.empty(capacity, dtype=np.float64)
+        opcodes[:self._size] = self._opcodes[:self._size]
+        angles[:self._size] = self._angles[:self._size]
+        self._opcodes, self._angles = opcodes, angles
+
+    def append(self, name, theta=None):
+        if self._size == len(self._opcodes):
+            self._grow(self._size + 1)
+        self._opcodes[self._size] = OPCODES[name]
+        self._angles[self._size] = theta or 0.0
+        self._size += 1
+
+    def extend(self, steps):
+        for name, theta in steps:
+            self.append(name, theta)
+
+    def extend_arrays(self, opcodes, angles):
+        """Append gates given directly as opcode and angle arrays."""
+        opcodes = np.asarray(opcodes)
+        if len(opcodes) and (opcodes.min() < 0 or opcodes.max() >= len(NAMES)):
+            raise ValueError(f"Opcodes must be below {len(NAMES)}")
+        opcodes = opcodes.astype(np.uint8)
+        size = self._size + len(opcodes)
+        if size > len(self._opcodes):
+            self._grow(size)
+        self._opcodes[self._size:size] = opcodes
+        self._angles[self._size:size] = angles
+        self._size = size
+
+    def clear(self):
+        self._size = 0
+        self._generation += 1
+
+    def truncate(self, size):
+        """Drop every gate from index size on."""
+        if 0 <= size < self._size:
+            self._size = size
+            self._generation += 1
+
+    def pop(self):
+        """Remove and return the last gate."""
+        step = self[self._size - 1]
+        self._size -= 1
+        self._generation += 1
+        return step
+
+    @property
+    def generation(self):
+        """Counter bumped whenever gates are removed.
+
+        Appending keeps every existing gate in place, so anything derived
+        from a prefix of the sequence stays valid while the generation
+        is unchanged.
+        """
+        return self._generation
+
+    @property
+    def opcodes(self):
+        """Read-only view of the opcodes in use."""
+        view = self._opcodes[:self._size]
+        view.flags.writeable = False
+        return view
+
+    @property
+    def angles(self):
+        """Read-only view of the angles in use."""
+        view = self._angles[:self._size]
+        view.flags.writeable = False
+        return view
+
+    def matrices(self):
+        """(N,2,2) stack with the matrix of every gate, built without a Python loop."""
+        opcodes = self._opcodes[:self._size]
+        stack = _FIXED_MATRICES[opcodes]
+        for name in ('rx', 'ry', 'rz'):
+            mask = opcodes == OPCODES[name]
+            if mask.any():
+                stack[mask] = gates.rotation_stack(name[1], self._angles[:self._size][mask])
+        return stack
+
+    def __len__(self):
+        return self._size
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            opcodes = self._opcodes[:self._size][index]
+            sliced = GateSequence(capacity=max(1, len(opcodes)))
+            sliced.extend_arrays(opcodes, self._angles[:self._size][index])
+            return sliced
+        if index < 0:
+            index += self._size
+        if not 0 <= index < self._size:
+            raise IndexError('gate index out of range')
+        opcode = int(self._opcodes[index])
+        theta = float(self._angles[index]) if opcode in ROTATIONS else None
+        return NAMES[opcode], theta
+
+    def __iter__(self):
+        names = [NAMES[opcode] for opcode in self._opcodes[:self._size].tolist()]
+        for name, theta in zip(names, self._angles[:self._size].tolist()):
+            yield name, (theta if OPCODES[name] in ROTATIONS else None)
+
+    def __eq__(self, other):
+        if not isinstance(other, GateSequence):
+            return NotImplemented
+        return (np.array_equal(self.opcodes, other.opcodes)
+                and np.array_equal(self.angles, other.angles))
+
+    # Mutable, so unhashable like a list
+    __hash__ = None
+
+    def __repr__(self):
+        return f'GateSequence({list(self)!r})'
+
+    def __reduce__(self):
+        # Pickle through the compact byte form when shipped between processes
+        return (GateSequence.from_bytes, (self.to_bytes(),))
+
+    def digest(self):
+        """Stable content hash, e.g. for caching results per sequence."""
+        return hashlib.blake2b(self.to_bytes(), digest_size=16).hexdigest()
+
+    def to_bytes(self):
+        """Serialize as a small header followed by the raw opcode and angle arrays."""
+        return (_HEADER.pack(_MAGIC, self._size)
+                + self._opcodes[:self._size].tobytes()
+                + self._angles[:self._size].astype('<f8').tobytes())
+
+    @classmethod
+    def from_bytes(cls, data):
+        magic, size = _HEADER.unpack_from(data)
+        if magic != _MAGIC:
+            raise ValueError('Not a serialized GateSequence')
+        offset = _HEADER.size
+        opcodes = np.frombuffer(data, dtype=np.uint8, count=size, offset=offset)
+        angles = np.frombuffer(data, dtype='<f8', count=size, offset=offset + size)
+        sequence = cls(capacity=max(size, 16))
+        sequence.extend_arrays(opcodes, angles)
+        return sequence
@@ -0,0 +1,89 @@
+#virtualized display of a long gate list: only the visible tokens are rendered
+import tkinter as tk
+
+import gates
+
+
+class SequenceView(tk.Frame):
+    """One line of gate tokens with paging, for a GateHistory of any length.
+
+    Only the tokens that fit in the line are formatted, so refreshing
+    costs the same for ten gates or ten thousand. The view follows the
+    newest gate until the user pages back.
+    """
+
+    def __init__(self, master, history, chars=14, font=('Arial', 32), bg='#2c94c5', **kwargs):
+        super().__init__(master, bg=bg, **kwargs)
+        self.history = history
+        self.chars = chars
+        # Index one past the last visible gate, or None to follow the newest gate
+        self.end = None
+        self.first = 0
+
+        self.line = tk.Label(self, font=font, bg=bg, anchor='w', width=chars)
+        self.line.pack(fill='x', padx=3, pady=4)
+
+        nav = tk.Frame(self, bg=bg)
+        nav.pack(fill='x')
+        for text, command in (('<<', self.home), ('<', self.page_back)):
+            tk.Button(nav, text=text, width=3, command=command).pack(side='left')
+        for text, command in (('>>', self.follow), ('>', self.page_forward)):
+            tk.Button(nav, text=text, width=3, command=command).pack(side='right')
+        self.position = tk.Label(nav, bg=bg)
+        self.position.pack(side='left', expand=True)
+        self.refresh()
+
+    def _window_before(self, end):
+        """First index of the tokens that fit on the line ending just before end."""
+        first, used = end, 0
+        while first > 0:
+            length = len(gates.gate_token(*self.history.step(first - 1))) + 1
+            if used + length > self.chars + 1 and first < end:
+                break
+            used += length
+            first -= 1
+        return first
+
+    def _window_after(self, first):
+        """Index one past the tokens that fit on the line starting at first."""
+        end, used = first, 0
+        while end < len(self.history):
+            length = len(gates.gate_token(*self.history.step(end))) + 1
+            if used + length > self.chars + 1 and end > first:
+                break
+            used += length
+            end += 1
+        return end
+
+    def refresh(self):
+        """Redraw after the history changed."""
+        size = len(self.history)
+        end = size if self.end is None else min(self.end, size)
+        self.first = self._window_before(end)
+        tokens = [gates.gate_token(*self.history.step(i)) for i in range(self.first, end)]
+        self.line.config(text=' '.join(tokens))
+        self.position.config(text=f'{self.first + 1 if end else 0}-{end} of {size}')
+
+    def page_back(self):
+        if self.first > 0:
+            self.end = self.first
+            self.refresh()
+
+    def page_forward(self):
+        end = len(self.history) if self.end is None else self.end
+        if end < len(self.history):
+            self.end = self._window_after(end)
+            if self.end >= len(self.history):
+                self.end = None
+            self.refresh()
+
+    def home(self):
+        self.end = self._window_after(0)
+        if self.end >= len(self.history):
+            self.end = None
+        self.refresh()
+
+    def follow(self):
+        """Jump to the newest gates and keep showing them as gates are added."""
+        self.end = None
+        self.refresh()
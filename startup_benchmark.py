@@ -0,0 +1,66 @@
+#time from a cold interpreter start to the first drawn window of each app
+"""Startup-time benchmark for the Tk entry points.
+
+Each app runs in a fresh interpreter, so nothing is already imported,
+and main(testing=True) returns once the window has been drawn. Needs a
+display.
+
+    python startup_benchmark.py [--repeat N] [module ...]
+"""
+import argparse
+import statistics
+import subprocess
+import sys
+
+APPS = {
+    'final': 'Quantum_Visualisation',
+    'Trial': 'QuantumVisualizer',
+    'trial3': 'QuantumVisualizer',
+    'trial_new': 'QuantumVisualizer',
+}
+
+# Run in the child; prints the import time and the time to first window
+_SCRIPT = '''
+import time
+start = time.perf_counter()
+import importlib
+module = importlib.import_module({module!r})
+imported = time.perf_counter()
+getattr(module, {app!r})().main(testing=True)
+shown = time.perf_counter()
+print(imported - start, shown - start)
+'''
+
+
+def measure(module, app):
+    """(import seconds, first window seconds) for one cold start."""
+    result = subprocess.run([sys.executable, '-c', _SCRIPT.format(module=module, app=app)],
+                            capture_output=True, text=True)
+    if result.returncode != 0:
+        lines = result.stderr.strip().splitlines() or ['exit code %d' % result.returncode]
+        raise RuntimeError(lines[-1])
+    imported, shown = result.stdout.split()[-2:]
+    return float(imported), float(shown)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('modules', nargs='*', default=list(APPS), help='apps to time (default: all)')
+    parser.add_argument('--repeat', type=int, default=5, help='cold starts per app')
+    args = parser.parse_args(argv)
+
+    print(f'{"app":<12}{"import (ms)":>14}{"first window (ms)":>20}')
+    for module in args.modules:
+        try:
+            runs = [measure(module, APPS[module]) for _ in range(args.repeat)]
+        except (KeyError, RuntimeError) as e:
+            print(f'{module:<12}  failed: {e}')
+            continue
+        imported = statistics.median(run[0] for run in runs) * 1000
+        shown = statistics.median(run[1] for run in runs) * 1000
+        print(f'{module:<12}{imported:>14.0f}{shown:>20.0f}')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,196 @@
+#n-qubit statevector simulation in plain NumPy
+"""Statevector engine for registers of several qubits.
+
+The 2^n amplitudes are viewed as an n-dimensional (2, 2, ..., 2) array
+and a gate only touches the axis of its qubit, so no 2^n x 2^n (or
+Kronecker product) matrix is ever built and a gate costs O(2^n).
+
+Qubits are numbered as in Qiskit: qubit 0 is the least significant bit
+of the basis index, i.e. the rightmost character of a bitstring.
+"""
+import numpy as np
+
+import gates
+import measurement
+
+
+def zero_state(num_qubits):
+    """|0...0> as a flat complex array of length 2^num_qubits."""
+    state = np.zeros(1 << num_qubits, dtype=complex)
+    state[0] = 1
+    return state
+
+
+def _axis(qubit, num_qubits):
+    if not 0 <= qubit < num_qubits:
+        raise ValueError(f'Qubit {qubit} is out of range for {num_qubits} qubits')
+    return num_qubits - 1 - qubit
+
+
+def _split(state, qubit, num_qubits):
+    """View of state as (high bits, qubit, low bits)."""
+    _axis(qubit, num_qubits)
+    return state.reshape(1 << (num_qubits - 1 - qubit), 2, 1 << qubit)
+
+
+# Below this qubit index the low-bit blocks are too short for matmul to pay off
+_MATMUL_MIN_QUBIT = 6
+
+
+def apply_gate(state, matrix, qubit, num_qubits, out=None):
+    """Apply a 2x2 gate to one qubit; returns the new state (written to out if given)."""
+    if out is None:
+        out = np.empty_like(state)
+    split = _split(state, qubit, num_qubits)
+    result = _split(out, qubit, num_qubits)
+    if qubit >= _MATMUL_MIN_QUBIT:
+        np.matmul(matrix, split, out=result)
+        return out
+    a, b = split[:, 0, :], split[:, 1, :]
+    for row in range(2):
+        np.multiply(a, matrix[row, 0], out=result[:, row, :])
+        result[:, row, :] += matrix[row, 1] * b
+    return out
+
+
+def apply_controlled(state, matrix, control, target, num_qubits):
+    """Apply a 2x2 gate to target where control is 1, in place."""
+    if control == target:
+        raise ValueError('Control and target must be different qubits')
+    control_axis = _axis(control, num_qubits)
+    target_axis = _axis(target, num_qubits)
+    tensor = state.reshape((2,) * num_qubits)
+    index = [slice(None)] * num_qubits
+    index[control_axis] = 1
+    # Basic indexing keeps a view; the target axis shifts if it came after the control
+    block = tensor[tuple(index)]
+    axis = target_axis - (target_axis > control_axis)
+    block[...] = np.moveaxis(np.tensordot(matrix, block, axes=([1], [axis])), 0, axis)
+    return state
+
+
+def apply_cz(state, control, target, num_qubits):
+    """Flip the sign of the amplitudes where both qubits are 1, in place."""
+    if control == target:
+        raise ValueError('CZ needs two different qubits')
+    tensor = state.reshape((2,) * num_qubits)
+    index = [slice(None)] * num_qubits
+    index[_axis(control, num_qubits)] = 1
+    index[_axis(target, num_qubits)] = 1
+    tensor[tuple(index)] *= -1
+    return state
+
+
+def apply_swap(state, qubit1, qubit2, num_qubits):
+    """Exchange two qubits; returns a new state."""
+    tensor = state.reshape((2,) * num_qubits)
+    swapped = np.swapaxes(tensor, _axis(qubit1, num_qubits), _axis(qubit2, num_qubits))
+    return np.ascontiguousarray(swapped).reshape(-1)
+
+
+def reduced_density_matrix(state, qubit, num_qubits):
+    """2x2 density matrix of one qubit, tracing out all the others."""
+    split = _split(state, qubit, num_qubits)
+    return np.tensordot(split, split.conj(), axes=([0, 2], [0, 2]))
+
+
+def density_bloch_vector(rho):
+    """Bloch vector of a 2x2 density matrix; shorter than 1 for mixed states."""
+    return np.array([2 * rho[1, 0].real, 2 * rho[1, 0].imag, (rho[0, 0] - rho[1, 1]).real])
+
+
+def bloch_vectors(state, num_qubits):
+    """(num_qubits, 3) array with the reduced Bloch vector of every qubit.
+
+    Each qubit only needs two sums over the statevector split on its
+    axis: conj(a) b for x and y, and the probability difference for z.
+    That is O(n 2^n) time and O(2^n) memory, without density matrices.
+    """
+    state = np.asarray(state, dtype=complex).reshape(-1)
+    p = state.real ** 2 + state.imag ** 2
+    vectors = np.empty((num_qubits, 3))
+    for qubit in range(num_qubits):
+        split = _split(state, qubit, num_qubits)
+        coherence = np.einsum('ij,ij->', split[:, 0, :].conj(), split[:, 1, :])
+        marginal = np.einsum('ijk->j', _split(p, qubit, num_qubits))
+        vectors[qubit] = 2 * coherence.real, 2 * coherence.imag, marginal[0] - marginal[1]
+    return vectors
+
+
+class MultiQubitCircuit:
+    """n-qubit circuit that applies every gate to its statevector immediately.
+
+    Gate methods take the target qubit (and control) like Qiskit's
+    QuantumCircuit, e.g. circuit.h(0); circuit.cx(0, 1). Fast enough for
+    interactive use up to about 20 qubits.
+    """
+
+    __slots__ = ('num_qubits', 'state', '_buffer')
+
+    def __init__(self, num_qubits):
+        self.num_qubits = num_qubits
+        self.state = zero_state(num_qubits)
+        self._buffer = np.empty_like(self.state)
+
+    def apply_gate(self, matrix, qubit):
+        # Write into the spare buffer and swap, so no array is allocated per gate
+        result = apply_gate(self.state, matrix, qubit, self.num_qubits, out=self._buffer)
+        self._buffer = self.state
+        self.state = result
+
+    def reset(self):
+        self.state = zero_state(self.num_qubits)
+
+    def x(self, qubit):
+        self.apply_gate(gates.X, qubit)
+
+    def y(self, qubit):
+        self.apply_gate(gates.Y, qubit)
+
+    def z(self, qubit):
+        self.apply_gate(gates.Z, qubit)
+
+    def h(self, qubit):
+        self.apply_gate(gates.H, qubit)
+
+    def s(self, qubit):
+        self.apply_gate(gates.S, qubit)
+
+    def sdg(self, qubit):
+        self.apply_gate(gates.SDG, qubit)
+
+    def t(self, qubit):
+        self.apply_gate(gates.T, qubit)
+
+    def tdg(self, qubit):
+        self.apply_gate(gates.TDG, qubit)
+
+    def rx(self, theta, qubit):
+        self.apply_gate(gates.rx(theta), qubit)
+
+    def ry(self, theta, qubit):
+        self.apply_gate(gates.ry(theta), qubit)
+
+    def rz(self, theta, qubit):
+        self.apply_gate(gates.rz(theta), qubit)
+
+    def cx(self, control, target):
+        apply_controlled(self.state, gates.X, control, target, self.num_qubits)
+
+    def cz(self, control, target):
+        apply_cz(self.state, control, target, self.num_qubits)
+
+    def swap(self, qubit1, qubit2):
+        if qubit1 != qubit2:
+            self.state = apply_swap(self.state, qubit1, qubit2, self.num_qubits)
+
+    def probabilities(self):
+        return measurement.probabilities(self.state)
+
+    def measure(self, shots=measurement.DEFAULT_SHOTS, rng=None):
+        """{bitstring: count} over shots measurements; the state is not collapsed."""
+        return measurement.counts(self.state, shots, rng)
+
+    def bloch_vectors(self):
+        """Reduced Bloch vector of every qubit, shape (num_qubits, 3)."""
+        return bloch_vectors(self.state, self.num_qubits)
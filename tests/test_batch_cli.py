@@ -0,0 +1,52 @@
+#tests for the headless batch evaluation command line
+import json
+
+import numpy as np
+import pytest
+
+import batch_cli
+
+
+@pytest.fixture
+def sequences(tmp_path):
+    path = tmp_path / 'sequences.txt'
+    path.write_text("# comment\nH\n\nX RY0.5\n")
+    return path
+
+
+def test_jsonl_output(sequences, tmp_path):
+    output = tmp_path / 'results.jsonl'
+    assert batch_cli.main([str(sequences), '-o', str(output), '--shots', '50', '--seed', '1']) == 0
+    records = [json.loads(line) for line in output.read_text().splitlines()]
+    assert [record['sequence'] for record in records] == ['H', 'X RY0.5']
+    assert np.allclose(records[0]['bloch'], [1, 0, 0])
+    assert all(sum(record['counts'].values()) == 50 for record in records)
+
+
+def test_npy_output(sequences, tmp_path):
+    output = tmp_path / 'results.npy'
+    assert batch_cli.main([str(sequences), '-o', str(output)]) == 0
+    rows = np.load(output)
+    assert rows.dtype == batch_cli.RESULT_DTYPE
+    assert np.allclose(rows['bloch'][1], [-1, 0, 0])
+
+
+def test_bad_line_reports_line_number_and_writes_nothing(tmp_path, capsys):
+    source = tmp_path / 'bad.txt'
+    source.write_text("H\nH FOO\n")
+    output = tmp_path / 'results.csv'
+    assert batch_cli.main([str(source), '-o', str(output)]) == 1
+    assert 'line 2' in capsys.readouterr().err
+    assert not output.exists()
+
+
+def test_missing_input_is_an_argument_error(tmp_path):
+    with pytest.raises(SystemExit) as exit_info:
+        batch_cli.main([str(tmp_path / 'missing.txt')])
+    assert exit_info.value.code == 2
+
+
+def test_negative_shots_is_an_argument_error(sequences):
+    with pytest.raises(SystemExit) as exit_info:
+        batch_cli.main([str(sequences), '--shots', '-1'])
+    assert exit_info.value.code == 2
@@ -0,0 +1,31 @@
+#tests for exporting Bloch trajectories to files
+import numpy as np
+import pytest
+from matplotlib import rcParams
+
+import export
+
+
+@pytest.mark.parametrize('name', ['out.gif', 'out.mp4', 'frames'])
+def test_export_frames_rejects_empty_input(tmp_path, name):
+    with pytest.raises(ValueError, match='No frames'):
+        export.export_frames(np.zeros((0, 3)), str(tmp_path / name))
+
+
+def test_export_frames_rejects_unknown_format(tmp_path):
+    with pytest.raises(ValueError, match='Unsupported'):
+        export.export_frames([[0, 0, 1]], str(tmp_path / 'out.avi'))
+
+
+def test_missing_ffmpeg_is_a_runtime_error(tmp_path, monkeypatch):
+    monkeypatch.setitem(rcParams, 'animation.ffmpeg_path', str(tmp_path / 'no-ffmpeg'))
+    with pytest.raises(RuntimeError, match='ffmpeg not found'):
+        export.export_frames([[0, 0, 1], [1, 0, 0]], str(tmp_path / 'out.mp4'), workers=1, dpi=20)
+
+
+def test_gif_export_writes_every_frame(tmp_path):
+    from PIL import Image
+    path = export.export_frames([[0, 0, 1], [1, 0, 0], [0, 1, 0]], str(tmp_path / 'out.gif'),
+                                workers=1, dpi=20)
+    with Image.open(path) as image:
+        assert image.n_frames == 3
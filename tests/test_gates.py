@@ -0,0 +1,33 @@
+#tests for the shared gate matrices and the rotation cache
+import numpy as np
+import pytest
+
+import gates
+
+
+def test_cached_rotation_is_computed_from_the_exact_angle():
+    theta = np.pi / 4 + 3e-13
+    assert np.array_equal(gates.rx(theta), gates.rotation_stack('x', [theta])[0])
+
+
+def test_rotation_cache_is_bounded():
+    for k in range(gates.ROTATION_CACHE_SIZE + 10):
+        gates.rz(k * 1e-3)
+    assert len(gates._rotations) <= gates.ROTATION_CACHE_SIZE
+
+
+@pytest.mark.parametrize('theta', [1e300, np.inf])
+def test_huge_angles_bypass_the_cache(theta):
+    with np.errstate(invalid='ignore'):
+        assert gates.ry(theta).shape == (2, 2)
+
+
+@pytest.mark.parametrize('token', ['RXinf', 'RYnan', 'RZ1e308'])
+def test_parse_gate_rejects_non_finite_angles(token):
+    with pytest.raises(ValueError, match='finite'):
+        gates.parse_gate(token)
+
+
+def test_parse_gate_reads_angles_in_multiples_of_pi():
+    assert gates.parse_gate('rx0.25') == ('rx', np.pi / 4)
+    assert gates.parse_gate('SD') == ('sdg', None)
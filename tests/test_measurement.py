@@ -0,0 +1,42 @@
+#tests for shot sampling from statevectors
+import numpy as np
+import pytest
+
+import measurement
+
+
+@pytest.mark.parametrize('shots', [0, 1, 1000, 10 ** 6])
+def test_counts_add_up_to_shots(shots):
+    state = np.array([1, 1j, -1, 0.5]) / np.sqrt(3.25)
+    assert measurement.sample_counts(state, shots, rng=0).sum() == shots
+    assert sum(measurement.counts(state, shots, rng=0).values()) == shots
+
+
+def test_counts_use_qiskit_bit_order():
+    # Amplitude 1 on index 1: qubit 0 is set, and qubit 0 is the rightmost bit
+    state = np.zeros(4)
+    state[1] = 1
+    assert measurement.counts(state, 10, rng=0) == {'01': 10}
+
+
+def test_seeded_sampling_is_reproducible():
+    state = np.full(8, 1 / np.sqrt(8))
+    assert measurement.counts(state, 500, rng=7) == measurement.counts(state, 500, rng=7)
+
+
+def test_frequencies_approach_probabilities():
+    state = np.array([np.sqrt(0.2), np.sqrt(0.8)])
+    sampled = measurement.sample_counts(state, 10 ** 6, rng=1)
+    assert np.allclose(sampled / 10 ** 6, [0.2, 0.8], atol=0.005)
+
+
+def test_bitstrings_have_one_entry_per_shot():
+    state = np.array([1, 1, 1, 1]) / 2
+    shots = measurement.sample_bitstrings(state, 400, rng=3)
+    assert len(shots) == 400
+    assert set(shots) <= {'00', '01', '10', '11'}
+
+
+def test_non_register_length_is_rejected():
+    with pytest.raises(ValueError):
+        measurement.counts(np.ones(3) / np.sqrt(3), 10)
@@ -0,0 +1,55 @@
+#tests for the peephole optimizer: equal to the input up to a global phase
+import numpy as np
+import pytest
+
+import gates
+import optimizer
+from sequence import NAMES
+
+
+def unitary(steps):
+    product = np.eye(2, dtype=complex)
+    for name, theta in steps:
+        product = gates.gate(name, theta) @ product
+    return product
+
+
+def equal_up_to_phase(a, b):
+    # |tr(A^dagger B)| is 2 exactly when B = e^(i phi) A for unitaries A and B
+    return np.isclose(abs(np.trace(a.conj().T @ b)), 2)
+
+
+def random_steps(rng, count):
+    steps = []
+    for opcode in rng.integers(len(NAMES), size=count):
+        name = NAMES[opcode]
+        if name in ('rx', 'ry', 'rz'):
+            # Mix exact multiples of PI/4 in with arbitrary angles
+            theta = rng.integers(-8, 9) * np.pi / 4 if rng.random() < 0.5 else rng.uniform(-10, 10)
+            steps.append((name, theta))
+        else:
+            steps.append((name, None))
+    return steps
+
+
+@pytest.mark.parametrize('seed', range(20))
+def test_optimized_sequence_is_equal_up_to_global_phase(seed):
+    steps = random_steps(np.random.default_rng(seed), 60)
+    optimized, removed = optimizer.optimize(steps)
+    assert equal_up_to_phase(unitary(steps), unitary(optimized))
+    assert len(optimized) + removed == len(steps)
+    assert removed >= 0
+
+
+@pytest.mark.parametrize('steps, expected', [
+    ([('h', None), ('h', None)], []),
+    ([('x', None), ('x', None)], []),
+    ([('t', None), ('t', None)], [('s', None)]),
+    ([('s', None), ('t', None), ('t', None)], [('z', None)]),
+    ([('rz', np.pi / 4), ('rz', -np.pi / 4)], []),
+    ([('rx', 2 * np.pi)], []),
+    ([('id', None), ('y', None)], [('y', None)]),
+])
+def test_known_reductions(steps, expected):
+    optimized, _ = optimizer.optimize(steps)
+    assert list(optimized) == expected
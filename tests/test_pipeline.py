@@ -0,0 +1,49 @@
+#tests for the lazy gate-stream pipeline
+import itertools
+
+import numpy as np
+import pytest
+
+import bloch
+import gates
+import pipeline
+
+
+def test_stages_yield_one_item_per_gate():
+    tokens = list(pipeline.tokenize(['H T', '', 'RX0.5 SD']))
+    assert tokens == ['H', 'T', 'RX0.5', 'SD']
+    vectors = list(pipeline.bloch_stream(tokens))
+    assert len(vectors) == 4
+    assert np.allclose(vectors[0], [1, 0, 0])
+    assert np.allclose(vectors[1], [np.cos(np.pi / 4), np.sin(np.pi / 4), 0])
+
+
+def test_final_state_matches_the_matrix_product():
+    tokens = ['H', 'T', 'RY0.3', 'SD', 'X']
+    expected = np.array([1, 0], dtype=complex)
+    for name, theta in map(gates.parse_gate, tokens):
+        expected = gates.gate(name, theta) @ expected
+    assert np.allclose(pipeline.final_state(tokens), expected)
+    assert np.allclose(list(pipeline.emit_bloch([expected]))[0], bloch.bloch_vector(expected))
+
+
+def test_final_state_starts_from_the_given_state():
+    assert np.allclose(pipeline.final_state(['X'], state=np.array([0, 1], dtype=complex)), [1, 0])
+
+
+def test_unknown_tokens_raise_unless_not_strict():
+    with pytest.raises(ValueError):
+        list(pipeline.parse(['H', 'FOO']))
+    assert list(pipeline.parse(['H', 'FOO'], strict=False)) == [('h', None)]
+
+
+def test_streams_are_lazy():
+    # An endless token stream is only consumed as far as it is read
+    vectors = pipeline.bloch_stream(itertools.cycle(['H', 'T']))
+    assert len(list(itertools.islice(vectors, 1000))) == 1000
+
+
+def test_random_tokens_yields_exactly_count_tokens():
+    tokens = list(pipeline.random_tokens(5000, rng=np.random.default_rng(0)))
+    assert len(tokens) == 5000
+    assert set(tokens) <= set(pipeline.RANDOM_TOKENS)
@@ -0,0 +1,48 @@
+#tests for the NumPy-only QuantumCircuit of quantum_glasses
+import numpy as np
+
+import bloch
+from quantum_glasses import QuantumCircuit, step_vectors
+
+
+def test_measure_after_apply_gates_applies_gates_once():
+    circuit = QuantumCircuit(1)
+    circuit.x()
+    circuit.apply_gates()
+    assert circuit.measure(shots=100, rng=0) == {'1': 100}
+    assert np.allclose(circuit.state_at(), [0, 1])
+
+
+def test_apply_gates_is_idempotent_in_both_modes():
+    circuit = QuantumCircuit(1)
+    circuit.h()
+    circuit.t()
+    circuit.rx(0.3)
+    circuit.apply_gates()
+    exact = circuit.state.copy()
+    circuit.apply_gates(compiled=True)
+    circuit.apply_gates(compiled=True)
+    assert np.allclose(circuit.state, exact)
+    assert np.allclose(circuit.state_at(), exact)
+
+
+def test_compile_after_clear_uses_new_gates():
+    circuit = QuantumCircuit(1)
+    circuit.h()
+    circuit.compile()
+    circuit.gates.clear()
+    circuit.x()
+    circuit.x()
+    assert np.allclose(circuit.compile(), np.eye(2))
+
+
+def test_step_vectors_match_state_at_every_step():
+    circuit = QuantumCircuit(1)
+    circuit.h()
+    circuit.rz(0.7)
+    circuit.s()
+    circuit.ry(-1.1)
+    vectors = step_vectors(circuit.gates[:], circuit.initial_state)
+    assert vectors.shape == (5, 3)
+    for k, vector in enumerate(vectors):
+        assert np.allclose(vector, bloch.bloch_vector(circuit.state_at(k)))
@@ -0,0 +1,56 @@
+#tests for the compact GateSequence storage
+import pickle
+
+import numpy as np
+import pytest
+
+import gates
+from sequence import NAMES, GateSequence
+
+STEPS = [('h', None), ('rx', 0.25), ('t', None), ('rz', -1.5), ('sdg', None)]
+
+
+def test_bytes_round_trip():
+    sequence = GateSequence(STEPS)
+    restored = GateSequence.from_bytes(sequence.to_bytes())
+    assert restored == sequence
+    assert list(restored) == STEPS
+    assert restored.digest() == sequence.digest()
+
+
+def test_pickle_round_trip():
+    sequence = GateSequence(STEPS)
+    assert pickle.loads(pickle.dumps(sequence)) == sequence
+
+
+def test_slicing_copies_the_selected_gates():
+    sequence = GateSequence(STEPS)
+    assert list(sequence[1:4]) == STEPS[1:4]
+    assert list(sequence[::-2]) == STEPS[::-2]
+    sequence.clear()
+    assert list(sequence[:]) == []
+
+
+def test_matrices_match_gate_lookup():
+    stack = GateSequence(STEPS).matrices()
+    assert np.allclose(stack, [gates.gate(name, theta) for name, theta in STEPS])
+
+
+def test_sequences_are_unhashable():
+    with pytest.raises(TypeError):
+        hash(GateSequence(STEPS))
+
+
+@pytest.mark.parametrize('opcode', [len(NAMES), 255, -1])
+def test_extend_arrays_rejects_unknown_opcodes(opcode):
+    sequence = GateSequence()
+    with pytest.raises(ValueError):
+        sequence.extend_arrays([0, opcode], [0.0, 0.0])
+    assert len(sequence) == 0
+
+
+def test_from_bytes_rejects_unknown_opcodes():
+    data = bytearray(GateSequence(STEPS).to_bytes())
+    data[8] = len(NAMES)
+    with pytest.raises(ValueError):
+        GateSequence.from_bytes(bytes(data))
@@ -0,0 +1,71 @@
+#tests for the NumPy statevector engine against Qiskit
+import numpy as np
+import pytest
+
+import statevector
+
+qiskit = pytest.importorskip('qiskit')
+from qiskit.quantum_info import Statevector  # noqa: E402
+
+FIXED = ('x', 'y', 'z', 'h', 's', 'sdg', 't', 'tdg')
+ROTATIONS = ('rx', 'ry', 'rz')
+TWO_QUBIT = ('cx', 'cz', 'swap')
+
+
+def random_circuits(seed, num_qubits, count):
+    """The same random gates applied to a MultiQubitCircuit and a Qiskit circuit."""
+    rng = np.random.default_rng(seed)
+    ours = statevector.MultiQubitCircuit(num_qubits)
+    theirs = qiskit.QuantumCircuit(num_qubits)
+    # Two-qubit gates need two qubits
+    names = FIXED + ROTATIONS + (TWO_QUBIT if num_qubits > 1 else ())
+    for _ in range(count):
+        name = rng.choice(names)
+        if name in TWO_QUBIT:
+            args = tuple(int(q) for q in rng.choice(num_qubits, size=2, replace=False))
+        elif name in ROTATIONS:
+            args = (float(rng.uniform(-np.pi, np.pi)), int(rng.integers(num_qubits)))
+        else:
+            args = (int(rng.integers(num_qubits)),)
+        getattr(ours, name)(*args)
+        getattr(theirs, name)(*args)
+    return ours, theirs
+
+
+@pytest.mark.parametrize('num_qubits', [1, 2, 3, 5, 8])
+@pytest.mark.parametrize('seed', range(3))
+def test_statevector_matches_qiskit(num_qubits, seed):
+    ours, theirs = random_circuits(seed, num_qubits, 40)
+    assert np.allclose(ours.state, Statevector(theirs).data)
+
+
+def test_probabilities_match_qiskit():
+    ours, theirs = random_circuits(11, 4, 30)
+    assert np.allclose(ours.probabilities(), Statevector(theirs).probabilities())
+
+
+def test_out_of_range_qubit_is_rejected():
+    circuit = statevector.MultiQubitCircuit(2)
+    with pytest.raises(ValueError):
+        circuit.h(2)
+
+
+@pytest.mark.parametrize('num_qubits', [1, 2, 4, 7])
+def test_reduced_bloch_vectors_match_partial_traces(num_qubits):
+    from qiskit.quantum_info import partial_trace
+
+    ours, theirs = random_circuits(num_qubits, num_qubits, 50)
+    vectors = ours.bloch_vectors()
+    state = Statevector(theirs)
+    for qubit in range(num_qubits):
+        others = [other for other in range(num_qubits) if other != qubit]
+        rho = partial_trace(state, others).data if others else np.outer(state.data, state.data.conj())
+        assert np.allclose(vectors[qubit], statevector.density_bloch_vector(rho))
+        assert np.allclose(rho, statevector.reduced_density_matrix(ours.state, qubit, num_qubits))
+
+
+def test_entangled_qubits_have_zero_length_bloch_vectors():
+    circuit = statevector.MultiQubitCircuit(2)
+    circuit.h(0)
+    circuit.cx(0, 1)
+    assert np.allclose(circuit.bloch_vectors(), 0)
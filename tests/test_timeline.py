@@ -0,0 +1,89 @@
+#tests for the prefix/range product index and the undo/redo history
+import numpy as np
+import pytest
+
+import gates
+import pipeline
+from history import GateHistory
+from sequence import GateSequence
+from timeline import ProductTree, Timeline
+
+
+def _matrices(count, seed=0):
+    tokens = list(pipeline.random_tokens(count, np.random.default_rng(seed))) + ['RX0.3', 'RY-1.2', 'RZ0.7']
+    return GateSequence(pipeline.parse(tokens)).matrices()
+
+
+def _product(matrices, start, stop):
+    result = np.eye(2, dtype=complex)
+    for matrix in matrices[start:stop]:
+        result = matrix @ result
+    return result
+
+
+@pytest.mark.parametrize('stride', [1, 5, 64])
+def test_prefix_and_range_products(stride):
+    matrices = _matrices(300)
+    timeline = Timeline(matrices[:100], stride=stride)
+    for matrix in matrices[100:150]:
+        timeline.append(matrix)
+    timeline.extend(matrices[150:])
+    assert len(timeline) == len(matrices)
+    for k in (0, 1, stride, 149, 150, len(matrices)):
+        assert np.allclose(timeline.unitary(k), _product(matrices, 0, k))
+    for start, stop in ((0, 0), (3, 4), (7, 250), (0, len(matrices))):
+        assert np.allclose(timeline.product(start, stop), _product(matrices, start, stop))
+
+
+@pytest.mark.parametrize('stride', [1, 4])
+def test_truncate_then_extend(stride):
+    matrices = _matrices(200, seed=1)
+    other = _matrices(200, seed=2)
+    timeline = Timeline(matrices, stride=stride)
+    timeline.truncate(80)
+    timeline.extend(other[:50])
+    expected = np.concatenate([matrices[:80], other[:50]])
+    assert len(timeline) == 130
+    assert np.allclose(timeline.unitary(), _product(expected, 0, 130))
+    assert np.allclose(timeline.unitary(100), _product(expected, 0, 100))
+    assert np.allclose(timeline.product(70, 120), _product(expected, 70, 120))
+    states = timeline.states()
+    assert states.shape == (131, 2)
+    assert np.allclose(states[100], _product(expected, 0, 100)[:, 0])
+
+
+def test_unitary_is_not_overwritten_by_later_changes():
+    matrices = _matrices(20)
+    timeline = Timeline(matrices)
+    held = timeline.unitary(10)
+    expected = held.copy()
+    timeline.truncate(5)
+    timeline.extend(_matrices(20, seed=3))
+    assert np.array_equal(held, expected)
+
+
+def test_product_tree_range_checks():
+    tree = ProductTree(_matrices(10))
+    assert np.allclose(ProductTree().product(), np.eye(2))
+    with pytest.raises(IndexError):
+        tree.product(3, 2)
+    with pytest.raises(IndexError):
+        tree.product(0, len(tree) + 1)
+
+
+def test_history_undo_redo_and_branching():
+    history = GateHistory([('h', None), ('t', None), ('rx', 0.4)])
+    assert history.undo() == ('rx', 0.4)
+    assert history.can_redo
+    assert np.allclose(history.unitary(), gates.T @ gates.H)
+    assert history.redo() == ('rx', 0.4)
+    history.undo()
+    history.append('x')
+    assert not history.can_redo
+    assert len(history) == 3
+    assert np.allclose(history.unitary(), gates.X @ gates.T @ gates.H)
+    assert np.allclose(history.product(1, 3), gates.X @ gates.T)
+    assert list(history.gates) == [('h', None), ('t', None), ('x', None)]
+    history.clear()
+    assert history.undo() is None
+    assert np.allclose(history.state(), [1, 0])
@@ -0,0 +1,33 @@
+#tests for trial_new's incremental statevector
+import numpy as np
+import pytest
+
+qiskit = pytest.importorskip('qiskit')
+from qiskit.quantum_info import Statevector  # noqa: E402
+
+from trial_new import QuantumVisualizer  # noqa: E402
+
+
+def test_incremental_statevector_matches_a_full_run():
+    app = QuantumVisualizer()
+    circuit = qiskit.QuantumCircuit(2)
+    for add in (lambda: circuit.h(0), lambda: circuit.cx(0, 1), lambda: circuit.rz(0.4, 1),
+                lambda: circuit.t(0), lambda: circuit.ry(-1.2, 0)):
+        add()
+        assert np.allclose(app.current_statevector(circuit).data, Statevector(circuit).data)
+    assert app.evolved_count == len(circuit.data)
+
+
+def test_new_or_shortened_circuit_starts_again():
+    app = QuantumVisualizer()
+    circuit = qiskit.QuantumCircuit(2)
+    circuit.x(0)
+    circuit.h(1)
+    app.current_statevector(circuit)
+
+    del circuit.data[-1]
+    assert np.allclose(app.current_statevector(circuit).data, Statevector(circuit).data)
+
+    fresh = qiskit.QuantumCircuit(2)
+    fresh.y(1)
+    assert np.allclose(app.current_statevector(fresh).data, Statevector(fresh).data)
@@ -0,0 +1,211 @@
+#prefix and range products of a gate list, for jumping to any step without replaying
+"""Unitary of any prefix or range of a single-qubit gate list.
+
+A Timeline keeps a cumulative product every `stride` gates (checkpoints)
+and a ProductTree, a segment tree of the gate matrices. The state after
+gate k is a checkpoint times at most stride - 1 gates, and the net
+effect of gates i..j is O(log n) tree nodes, so a timeline slider can
+jump anywhere in a long sequence without replaying it from |0>.
+
+    timeline = Timeline(sequence.matrices())
+    timeline.state(k)        # state after the first k gates
+    timeline.product(i, j)   # gates i..j-1 as one 2x2 unitary
+"""
+import numpy as np
+
+import bloch
+import gates
+
+
+class ProductTree:
+    """Segment tree of 2x2 matrices; product(i, j) multiplies gates i..j-1.
+
+    Leaves hold the gate matrices, every node the product of its two
+    children (the later gate on the left), and unused leaves the
+    identity. Appending or truncating updates only the ancestors of the
+    changed leaves, one batched matmul per level.
+    """
+
+    __slots__ = ('_tree', '_capacity', '_size')
+
+    def __init__(self, matrices=(), capacity=16):
+        self._capacity = 1
+        while self._capacity < capacity:
+            self._capacity *= 2
+        self._tree = np.empty((2 * self._capacity, 2, 2), dtype=complex)
+        self._tree[:] = gates.I
+        self._size = 0
+        if len(matrices):
+            self.extend(matrices)
+
+    def __len__(self):
+        return self._size
+
+    def _grow(self, needed):
+        capacity = self._capacity
+        while capacity < needed:
+            capacity *= 2
+        tree = np.empty((2 * capacity, 2, 2), dtype=complex)
+        tree[:] = gates.I
+        tree[capacity:capacity + self._size] = self._tree[self._capacity:self._capacity + self._size]
+        self._tree, self._capacity = tree, capacity
+        self._update(0, self._size)
+
+    def _update(self, start, stop):
+        """Recompute the ancestors of leaves start..stop-1."""
+        if start >= stop:
+            return
+        tree = self._tree
+        low, high = start + self._capacity, stop + self._capacity
+        while low > 1:
+            low, high = low // 2, (high - 1) // 2 + 1
+            np.matmul(tree[2 * low + 1:2 * high:2], tree[2 * low:2 * high:2], out=tree[low:high])
+
+    def append(self, matrix):
+        self.extend(np.asarray(matrix)[None])
+
+    def extend(self, matrices):
+        """Append an (N,2,2) stack of gate matrices."""
+        matrices = np.asarray(matrices, dtype=complex).reshape(-1, 2, 2)
+        size = self._size + len(matrices)
+        if size > self._capacity:
+            self._grow(size)
+        self._tree[self._capacity + self._size:self._capacity + size] = matrices
+        self._update(self._size, size)
+        self._size = size
+
+    def truncate(self, size):
+        """Drop every gate from index size on."""
+        if 0 <= size < self._size:
+            self._tree[self._capacity + size:self._capacity + self._size] = gates.I
+            self._update(size, self._size)
+            self._size = size
+
+    def product(self, start=0, stop=None):
+        """Net unitary of gates start..stop-1 (all gates by default)."""
+        stop = self._size if stop is None else stop
+        if not 0 <= start <= stop <= self._size:
+            raise IndexError('gate range out of range')
+        tree = self._tree
+        # Nodes left of the range middle come first and are multiplied in on the right
+        before, after = gates.I, gates.I
+        low, high = start + self._capacity, stop + self._capacity
+        while low < high:
+            if low & 1:
+                before = tree[low] @ before
+                low += 1
+            if high & 1:
+                high -= 1
+                after = after @ tree[high]
+            low, high = low // 2, high // 2
+        return after @ before
+
+
+class Timeline:
+    """Cumulative unitaries of a growing gate list, checkpointed every stride gates.
+
+    With stride 1 (the default) every prefix is stored and unitary(k) is
+    a lookup; a larger stride saves memory and costs one O(log stride)
+    tree query per lookup.
+    """
+
+    __slots__ = ('stride', '_checkpoints', '_tree')
+
+    def __init__(self, matrices=(), stride=1, capacity=16):
+        self.stride = stride
+        self._checkpoints = np.empty((capacity // stride + 1, 2, 2), dtype=complex)
+        self._checkpoints[0] = gates.I
+        self._tree = ProductTree(capacity=capacity)
+        if len(matrices):
+            self.extend(matrices)
+
+    def __len__(self):
+        return len(self._tree)
+
+    def append(self, matrix):
+        self.extend(np.asarray(matrix)[None])
+
+    def extend(self, matrices):
+        """Append an (N,2,2) stack of gate matrices, e.g. GateSequence.matrices()."""
+        matrices = np.asarray(matrices, dtype=complex).reshape(-1, 2, 2)
+        start = len(self)
+        count = (start + len(matrices)) // self.stride + 1
+        if count > len(self._checkpoints):
+            checkpoints = np.empty((max(count, 2 * len(self._checkpoints)), 2, 2), dtype=complex)
+            checkpoints[:len(self._checkpoints)] = self._checkpoints
+            self._checkpoints = checkpoints
+        base = self.unitary()
+        self._tree.extend(matrices)
+        # Steps start+1..start+N that land on a checkpoint
+        first = start // self.stride + 1
+        steps = np.arange(first, count) * self.stride
+        if len(steps):
+            prefixes = _prefix_products(matrices)
+            self._checkpoints[first:count] = prefixes[steps - start - 1] @ base
+
+    def truncate(self, size):
+        """Drop every gate from index size on."""
+        self._tree.truncate(size)
+
+    def unitary(self, k=None):
+        """Product of the first k gates (all gates by default), as a new array."""
+        k = len(self) if k is None else k
+        if not 0 <= k <= len(self):
+            raise IndexError('step out of range')
+        checkpoint, rest = divmod(k, self.stride)
+        if rest:
+            return self._tree.product(k - rest, k) @ self._checkpoints[checkpoint]
+        # A copy: the checkpoint slot is rewritten after truncate and extend
+        return self._checkpoints[checkpoint].copy()
+
+    def unitaries(self):
+        """(N+1,2,2) products of the first k gates for every k from 0 to N."""
+        if self.stride == 1:
+            return self._checkpoints[:len(self) + 1].copy()
+        return np.array([self.unitary(k) for k in range(len(self) + 1)])
+
+    def product(self, start=0, stop=None):
+        """Net unitary of gates start..stop-1, in O(log n)."""
+        return self._tree.product(start, stop)
+
+    def state(self, k=None, initial=None):
+        """State after the first k gates, starting from initial (|0> by default)."""
+        if initial is None:
+            return self.unitary(k)[:, 0].copy()
+        return self.unitary(k) @ np.asarray(initial, dtype=complex).reshape(2)
+
+    def bloch_vector(self, k=None, initial=None):
+        return bloch.bloch_vector(self.state(k, initial))
+
+    def states(self, initial=None):
+        """(N+1,2) state after every prefix, starting from initial (|0> by default)."""
+        unitaries = self.unitaries()
+        if initial is None:
+            return unitaries[:, :, 0].copy()
+        return unitaries @ np.asarray(initial, dtype=complex).reshape(2)
+
+
+def _matmul_stack(a, b):
+    """a[n] @ b[n] for stacks of 2x2 matrices, written out elementwise.
+
+    For 2x2 blocks this is several times faster than np.matmul on the stack.
+    """
+    out = np.empty(a.shape, dtype=complex)
+    for i in range(2):
+        for j in range(2):
+            np.multiply(a[:, i, 0], b[:, 0, j], out=out[:, i, j])
+            out[:, i, j] += a[:, i, 1] * b[:, 1, j]
+    return out
+
+
+def _prefix_products(matrices):
+    """(N,2,2) products matrices[k] @ ... @ matrices[0] for every k.
+
+    A Hillis-Steele scan: log2(N) batched products instead of N single ones.
+    """
+    prefixes = matrices.copy()
+    offset = 1
+    while offset < len(prefixes):
+        prefixes[offset:] = _matmul_stack(prefixes[offset:], prefixes[:-offset])
+        offset *= 2
+    return prefixes
@@ -2,17 +2,28 @@ import os
 from platform import system
 import tkinter as tk
 from tkinter import *
+from tkinter import filedialog
 import warnings
 import numpy as np
-import matplotlib.pyplot as plt
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 from matplotlib.widgets import Button
 
+import bloch
+import export
+import gates
+import optimizer
+from animation import BlochAnimator, DEFAULT_FPS, DEFAULT_FRAME_BUDGET, DEFAULT_FRAMES_PER_GATE, transition_frames
+from dialogs import DialogManager
+from history import GateHistory
+from sequence_view import SequenceView
+from worker import TkWorker
+
 # Suppress warnings
 warnings.simplefilter("ignore")
 
 # Define a simple quantum circuit class to handle single qubit operations
 class SimpleQuantumCircuit:
+    __slots__ = ('state',)
+
     def __init__(self):
         # Initial state vector for |0>
         self.state = np.array([[1], [0]], dtype=complex)
@@ -22,67 +33,121 @@ class SimpleQuantumCircuit:
     
     def x(self):
         # Pauli-X gate
-        x_gate = np.array([[0, 1], [1, 0]], dtype=complex)
-        self.apply_gate(x_gate)
+        self.apply_gate(gates.X)
     
     def y(self):
         # Pauli-Y gate
-        y_gate = np.array([[0, -1j], [1j, 0]], dtype=complex)
-        self.apply_gate(y_gate)
+        self.apply_gate(gates.Y)
     
     def z(self):
         # Pauli-Z gate
-        z_gate = np.array([[1, 0], [0, -1]], dtype=complex)
-        self.apply_gate(z_gate)
+        self.apply_gate(gates.Z)
     
     def rx(self, theta):
         # Rotation around X-axis
-        rx_gate = np.array([[np.cos(theta/2), -1j*np.sin(theta/2)], [-1j*np.sin(theta/2), np.cos(theta/2)]], dtype=complex)
-        self.apply_gate(rx_gate)
+        self.apply_gate(gates.rx(theta))
     
     def ry(self, theta):
         # Rotation around Y-axis
-        ry_gate = np.array([[np.cos(theta/2), -np.sin(theta/2)], [np.sin(theta/2), np.cos(theta/2)]], dtype=complex)
-        self.apply_gate(ry_gate)
+        self.apply_gate(gates.ry(theta))
     
     def rz(self, theta):
         # Rotation around Z-axis
-        rz_gate = np.array([[np.exp(-1j*theta/2), 0], [0, np.exp(1j*theta/2)]], dtype=complex)
-        self.apply_gate(rz_gate)
+        self.apply_gate(gates.rz(theta))
     
     def s(self):
         # S gate
-        s_gate = np.array([[1, 0], [0, 1j]], dtype=complex)
-        self.apply_gate(s_gate)
+        self.apply_gate(gates.S)
     
     def sdg(self):
         # S-dagger gate
-        sdg_gate = np.array([[1, 0], [0, -1j]], dtype=complex)
-        self.apply_gate(sdg_gate)
+        self.apply_gate(gates.SDG)
     
     def t(self):
         # T gate
-        t_gate = np.array([[1, 0], [0, np.exp(1j*np.pi/4)]], dtype=complex)
-        self.apply_gate(t_gate)
+        self.apply_gate(gates.T)
     
     def tdg(self):
         # T-dagger gate
-        tdg_gate = np.array([[1, 0], [0, np.exp(-1j*np.pi/4)]], dtype=complex)
-        self.apply_gate(tdg_gate)
+        self.apply_gate(gates.TDG)
     
     def h(self):
         # Hadamard gate
-        h_gate = np.array([[1, 1], [1, -1]], dtype=complex) / np.sqrt(2)
-        self.apply_gate(h_gate)
+        self.apply_gate(gates.H)
     
     def get_bloch_vector(self):
         # Compute the Bloch vector from the state vector
-        a = self.state[0, 0]
-        b = self.state[1, 0]
-        x = 2 * np.real(np.conj(a) * b)
-        y = 2 * np.imag(np.conj(a) * b)
-        z = np.real(np.conj(a) * a - np.conj(b) * b)
-        return np.array([x, y, z])
+        return bloch.bloch_vector(self.state)
+
+# Batched counterpart of SimpleQuantumCircuit: N independent single qubits
+class BatchedCircuit:
+    __slots__ = ('state',)
+
+    def __init__(self, n):
+        # Row i holds the amplitudes of circuit i, all starting in |0>
+        self.state = np.zeros((n, 2), dtype=complex)
+        self.state[:, 0] = 1
+
+    def __len__(self):
+        return self.state.shape[0]
+
+    def apply_gate(self, gate_matrix):
+        # A single (2,2) gate acts on every row, a (N,2,2) stack row by row
+        gate_matrix = np.asarray(gate_matrix)
+        if gate_matrix.ndim == 2:
+            self.state = self.state @ gate_matrix.T
+        else:
+            self.state = np.einsum('nij,nj->ni', gate_matrix, self.state)
+
+    def x(self):
+        self.apply_gate(gates.X)
+
+    def y(self):
+        self.apply_gate(gates.Y)
+
+    def z(self):
+        self.apply_gate(gates.Z)
+
+    def rx(self, theta):
+        self.apply_gate(gates.rx(theta))
+
+    def ry(self, theta):
+        self.apply_gate(gates.ry(theta))
+
+    def rz(self, theta):
+        self.apply_gate(gates.rz(theta))
+
+    def s(self):
+        self.apply_gate(gates.S)
+
+    def sdg(self):
+        self.apply_gate(gates.SDG)
+
+    def t(self):
+        self.apply_gate(gates.T)
+
+    def tdg(self):
+        self.apply_gate(gates.TDG)
+
+    def h(self):
+        self.apply_gate(gates.H)
+
+    def get_bloch_vector(self):
+        # Bloch vectors of all N states as an (N,3) array
+        return bloch.bloch_vector(self.state)
+
+def sweep(gate, thetas, circuit=None):
+    """Bloch vectors after applying gate ('rx', 'ry' or 'rz') for every theta.
+
+    Starts from the current state of circuit (|0> if omitted) and returns
+    an (N,3) array, one row per angle.
+    """
+    thetas = np.asarray(thetas, dtype=float).reshape(-1)
+    batch = BatchedCircuit(thetas.size)
+    if circuit is not None:
+        batch.state[:] = circuit.state[:, 0]
+    batch.apply_gate(gates.rotation(gate[1], thetas))
+    return batch.get_bloch_vector()
 
 circuit = SimpleQuantumCircuit()
 theta = 0
@@ -94,26 +159,33 @@ SPECIAL_BTN_COLOR = '#bc3457'
 BTN_FONT = ('Arial', 18)
 DISPLAY_FONT = ('Arial', 32)
 
+def trajectory(steps, frames_per_gate=DEFAULT_FRAMES_PER_GATE, optimize=True):
+    """(Bloch frames, gates removed) for a gate sequence; runs on a worker thread."""
+    removed = 0
+    if optimize:
+        steps, removed = optimizer.optimize(steps)
+    return transition_frames(steps, frames_per_gate, frame_budget=DEFAULT_FRAME_BUDGET), removed
+
+
 class QuantumVisualizer:
     """Primary class for the Quantum Visualizer application."""
 
-    def __init__(self):
+    def __init__(self, fps=DEFAULT_FPS, frames_per_gate=DEFAULT_FRAMES_PER_GATE, optimize=True):
         self.visualization_window = None
-        self.gate_sequence = []
-
-    @staticmethod
-    def show_about():
+        self.dialogs = None
+        self.animator = None
+        self.timeline = None
+        self.scrubbed = None
+        self.worker = None
+        self.fps = fps
+        self.frames_per_gate = frames_per_gate
+        self.optimize = optimize
+        # Every gate added, with O(1) undo/redo and the state after each of them
+        self.history = GateHistory()
+        self.view = None
+
+    def show_about(self):
         """Display project information."""
-        about_window = tk.Tk()
-        about_window.title('About')
-        about_window.geometry('650x470')
-
-        info_label = tk.Label(about_window, text="About Quantum Visualizer:", font=("Arial", 14))
-        info_label.pack()
-
-        text_widget = tk.Text(about_window, height=20, width=20)
-        text_widget.pack(fill='both', expand=True)
-
         info_text = """
         About: Visualization tool for Single Qubit Rotation on Bloch Sphere
         BY:Team ÅvinyÅ 
@@ -135,129 +207,127 @@ class QuantumVisualizer:
         Allowed range for theta (rotation_angle) in the app is [-2*PI, 2*PI]
 
         If visualization fails, the app closes automatically.
-        Only ten operations can be visualized at a time.
+        Undo and Redo step through the gate list; << < > >> page through it.
         """
-        text_widget.insert(END, info_text)
-
-        about_window.mainloop()
+        self.dialogs.about(info_text, heading="About Quantum Visualizer:")
 
-    @staticmethod
-    def set_theta(num, window, circuit, key):
-        """Set theta value and close the input window."""
+    def set_theta(self, num, key):
+        """Set theta value and add the rotation to the history."""
         global theta
         theta = num * np.pi
-        if key == 'x':
-            circuit.rx(theta)
-        elif key == 'y':
-            circuit.ry(theta)
-        else:
-            circuit.rz(theta)
+        self.add_gate('r' + key, theta)
         theta = 0
-        window.destroy()
 
-    def get_theta(self, circuit, key):
-        """Prompt user to input rotation angle for Rx, Ry, Rz gates."""
-        input_window = tk.Tk()
-        input_window.title('Input Theta')
-        input_window.geometry('360x160')
-        input_window.resizable(0, 0)
+    def get_theta(self, key):
+        """Prompt user to input rotation angle for Rx, Ry, Rz gates.
 
-        btns = [
-            ('PI/4', 0.25), ('PI/2', 0.50), ('PI', 1.0), ('2*PI', 2.0),
-            ('-PI/4', -0.25), ('-PI/2', -0.50), ('-PI', -1.0), ('-2*PI', -2.0)
-        ]
+        Closing the window without a choice adds no gate.
+        """
+        self.dialogs.ask_theta(lambda num: self.set_theta(num, key), button_color=BTN_COLOR,
+                               state=circuit.state, axis=key)
+
+    def sync(self):
+        """Set the circuit to the state after the active gates and redraw the display."""
+        circuit.state = self.history.state().reshape(2, 1)
+        self.view.refresh()
 
-        for idx, (text, val) in enumerate(btns):
-            btn = tk.Button(input_window, height=2, width=10, bg=BTN_COLOR, font=("Arial", 10), text=text,
-                            command=lambda v=val: self.set_theta(v, input_window, circuit, key))
-            btn.grid(row=idx//4, column=idx%4, padx=5, pady=5)
+    def add_gate(self, name, theta=None):
+        self.history.append(name, theta)
+        self.sync()
 
-        note_text = tk.Text(input_window, height=2, width=35, bg="light cyan")
-        note_text.insert(END, "Provide the value for theta\nRange: [-2*PI, 2*PI]")
-        note_text.grid(row=2, columnspan=4, pady=10)
+    def undo(self):
+        if self.history.undo() is not None:
+            self.sync()
 
-        input_window.mainloop()
+    def redo(self):
+        if self.history.redo() is not None:
+            self.sync()
 
     def visualize(self, gate_sequence):
         """Visualize the quantum circuit's single qubit rotations."""
-        if self.visualization_window and self.visualization_window.winfo_exists():
-            self.visualization_window.destroy()
+        if not (self.visualization_window and self.visualization_window.winfo_exists()):
+            self.visualization_window = tk.Toplevel()
+            self.visualization_window.title("Visualization")
 
-        self.visualization_window = tk.Toplevel()
-        self.visualization_window.title("Visualization")
+            vis_frame = tk.Frame(self.visualization_window)
+            vis_frame.pack(fill='both', expand=True)
+            self.animator = BlochAnimator(vis_frame, fps=self.fps, frames_per_gate=self.frames_per_gate)
 
-        vis_frame = tk.Frame(self.visualization_window)
-        vis_frame.pack(fill='both', expand=True)
-
-        try:
-            current_circuit = SimpleQuantumCircuit()
-            for gate in gate_sequence:
-                if gate == 'x':
-                    current_circuit.x()
-                elif gate == 'y':
-                    current_circuit.y()
-                elif gate == 'z':
-                    current_circuit.z()
-                elif gate.startswith('rx'):
-                    theta = float(gate[2:])
-                    current_circuit.rx(theta)
-                elif gate.startswith('ry'):
-                    theta = float(gate[2:])
-                    current_circuit.ry(theta)
-                elif gate.startswith('rz'):
-                    theta = float(gate[2:])
-                    current_circuit.rz(theta)
-                elif gate == 's':
-                    current_circuit.s()
-                elif gate == 'sd':
-                    current_circuit.sdg()
-                elif gate == 'h':
-                    current_circuit.h()
-                elif gate == 't':
-                    current_circuit.t()
-                elif gate == 'td':
-                    current_circuit.tdg()
-
-                bloch_vector = current_circuit.get_bloch_vector()
-                fig = plt.figure()
-                ax = fig.add_subplot(111, projection='3d')
-                ax.quiver(0, 0, 0, bloch_vector[0], bloch_vector[1], bloch_vector[2])
-                ax.set_xlim([-1, 1])
-                ax.set_ylim([-1, 1])
-                ax.set_zlim([-1, 1])
-                ax.set_xlabel('X')
-                ax.set_ylabel('Y')
-                ax.set_zlabel('Z')
-                plt.title('Bloch Sphere')
-
-                canvas = FigureCanvasTkAgg(fig, master=vis_frame)
-                canvas.draw()
-                canvas.get_tk_widget().pack(fill='both', expand=True)
-
-                vis_frame.after(1000, lambda: canvas.get_tk_widget().destroy())
-
-            end_ax = fig.add_axes([0.85, 0.05, 0.1, 0.075])
-            end_button = Button(end_ax, 'End')
+            end_ax = self.animator.figure.add_axes([0.85, 0.05, 0.1, 0.075])
+            self.end_button = Button(end_ax, 'End')
 
             def close_vis(event):
+                self.animator.stop()
                 self.visualization_window.destroy()
 
-            end_button.on_clicked(close_vis)
-
-        except Exception as e:
-            print(e)
+            self.end_button.on_clicked(close_vis)
+
+            save_ax = self.animator.figure.add_axes([0.70, 0.05, 0.12, 0.075])
+            self.save_button = Button(save_ax, 'Save')
+            self.save_button.on_clicked(lambda event: self.export_animation())
+
+            # Scrubbing shows the state after any gate from the history's prefix products
+            self.timeline = tk.Scale(self.visualization_window, from_=0, orient=tk.HORIZONTAL,
+                                     label='Gates applied', command=self.scrub)
+            self.timeline.pack(fill='x', padx=10)
+
+        # Setting the slider also calls scrub; the step it shows is skipped there
+        self.scrubbed = len(self.history)
+        self.timeline.config(to=len(self.history))
+        self.timeline.set(len(self.history))
+
+        # The trajectory is computed on a worker thread; a newer request supersedes this one
+        self.worker.submit('visualize', trajectory, gate_sequence[:], self.frames_per_gate, self.optimize,
+                           on_done=self.show_trajectory, on_error=self.visualization_failed)
+
+    def scrub(self, value):
+        """Stop the animation and show the state after the first value gates."""
+        k = min(int(value), len(self.history))
+        if k == self.scrubbed:
+            return
+        self.scrubbed = k
+        self.animator.stop()
+        self.animator.show_vector(self.history.bloch_vector(k))
+
+    def show_trajectory(self, result):
+        frames, removed = result
+        if not self.visualization_window.winfo_exists():
+            return
+        if self.optimize:
+            self.visualization_window.title(f"Visualization ({removed} redundant gates removed)")
+        self.animator.play_frames(frames)
+
+    def visualization_failed(self, error):
+        print(error)
+        if self.visualization_window.winfo_exists():
             self.visualization_window.destroy()
 
+    def export_animation(self):
+        """Save the last animation as MP4, GIF or a folder of PNG frames."""
+        path = filedialog.asksaveasfilename(parent=self.visualization_window, defaultextension='.gif',
+                                            filetypes=[('GIF', '*.gif'), ('MP4', '*.mp4'),
+                                                       ('PNG frames', '*.png')])
+        if not path:
+            return
+        fmt = None
+        if path.endswith('.png'):
+            # A PNG sequence goes into a folder named after the file
+            path, fmt = path[:-4], 'png'
+        self.worker.submit('export', export.export_frames, self.animator.frames, path, fmt, self.fps,
+                           on_done=lambda saved: print(f"Saved {saved}"))
+
     def main(self, testing=False):
         """Main application function."""
         try:
             root = tk.Tk()
+            self.dialogs = DialogManager(root)
+            self.worker = TkWorker(root)
             root.title('Quantum Visualizer')
             current_dir = os.path.dirname(os.path.abspath(__file__))
             if system() == 'Windows':
                 root.iconbitmap(default=os.path.join(current_dir, "../logo.ico"))
 
-            root.geometry('420x420')
+            root.geometry('420x540')
             root.resizable(0, 0)
 
             display_frame = tk.LabelFrame(root)
@@ -265,49 +335,40 @@ class QuantumVisualizer:
             display_frame.pack()
             button_frame.pack(fill='both', expand=True)
 
-            display = tk.Entry(display_frame, width=120, font=DISPLAY_FONT, bg=BG_COLOR, borderwidth=2, justify=LEFT)
-            display.pack(padx=3, pady=4)
-
-            def update_display(gate):
-                display.insert(END, gate)
-                self.gate_sequence.append(gate)
-                if len(display.get()) == 10:
-                    for btn in buttons:
-                        btn.config(state=DISABLED)
+            # Only the visible window of the gate list is rendered, so it can grow without limit
+            self.view = SequenceView(display_frame, self.history, font=DISPLAY_FONT, bg=BG_COLOR)
+            self.view.pack(padx=3, pady=4)
 
             buttons = [
-                ('X', 'x', lambda: [circuit.x(), update_display('x')]),
-                ('Y', 'y', lambda: [circuit.y(), update_display('y')]),
-                ('Z', 'z', lambda: [circuit.z(), update_display('z')]),
-                ('RX', 'Rx', lambda: self.get_theta(circuit, 'x')),
-                ('RY', 'Ry', lambda: self.get_theta(circuit, 'y')),
-                ('RZ', 'Rz', lambda: self.get_theta(circuit, 'z')),
-                ('S', 's', lambda: [circuit.s(), update_display('s')]),
-                ('SD', 'sd', lambda: [circuit.sdg(), update_display('sd')]),
-                ('H', 'H', lambda: [circuit.h(), update_display('h')]),
-                ('T', 't', lambda: [circuit.t(), update_display('t')]),
-                ('TD', 'td', lambda: [circuit.tdg(), update_display('td')])
+                ('X', lambda: self.add_gate('x')),
+                ('Y', lambda: self.add_gate('y')),
+                ('Z', lambda: self.add_gate('z')),
+                ('RX', lambda: self.get_theta('x')),
+                ('RY', lambda: self.get_theta('y')),
+                ('RZ', lambda: self.get_theta('z')),
+                ('S', lambda: self.add_gate('s')),
+                ('SD', lambda: self.add_gate('sdg')),
+                ('H', lambda: self.add_gate('h')),
+                ('T', lambda: self.add_gate('t')),
+                ('TD', lambda: self.add_gate('tdg'))
             ]
 
-            for i, (text, display_text, cmd) in enumerate(buttons):
-                btn = tk.Button(button_frame, font=BTN_FONT, bg=BTN_COLOR, text=text,
-                                command=lambda d=display_text, c=cmd: [c(), update_display(d)])
+            for i, (text, cmd) in enumerate(buttons):
+                btn = tk.Button(button_frame, font=BTN_FONT, bg=BTN_COLOR, text=text, command=cmd)
                 btn.grid(row=i//3, column=i%3, padx=5, pady=5, sticky='WE')
-                buttons[i] = btn
 
-            def clear_display(circuit):
-                display.delete(0, END)
-                global circuit_instance
-                circuit_instance = SimpleQuantumCircuit()
-                self.gate_sequence.clear()
-                for btn in buttons:
-                    btn.config(state=NORMAL)
+            def clear_display():
+                self.history.clear()
+                self.view.follow()
+                self.sync()
 
             special_buttons = [
                 ('Quit', root.destroy),
-                ('Visualize', lambda: self.visualize(self.gate_sequence)),
-                ('Clear', lambda: clear_display(circuit)),
-                ('About', self.show_about)
+                ('Visualize', lambda: self.visualize(self.history.gates)),
+                ('Clear', clear_display),
+                ('About', self.show_about),
+                ('Undo', self.undo),
+                ('Redo', self.redo)
             ]
 
             for i, (text, cmd) in enumerate(special_buttons):
@@ -4,12 +4,11 @@ import warnings
 import tkinter as tk
 from tkinter import END, LEFT
 import numpy as np
-from qiskit import QuantumCircuit, transpile
-from qiskit_aer import AerSimulator
-from qiskit.visualization import visualize_transition
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-import matplotlib.pyplot as plt
-from matplotlib.widgets import Button
+
+import lazy
+from dialogs import DialogManager
+from qiskit_cache import cached_transpile
+from worker import TkWorker
 
 # Suppress warnings
 warnings.simplefilter("ignore")
@@ -17,8 +16,9 @@ warnings.simplefilter("ignore")
 # Setup the quantum circuit
 def setup_circuit(initial_state="0"):
     global circuit, simulator
+    from qiskit import QuantumCircuit
     circuit = QuantumCircuit(2)
-    simulator = AerSimulator()
+    simulator = get_simulator()
 
     if initial_state == "1":
         circuit.x(0)
@@ -32,8 +32,38 @@ def setup_circuit(initial_state="0"):
         circuit.ry(theta, 0)
     # Add more initial states as needed
 
-setup_circuit(initial_state="1")  # Example to set the initial state to |1>
-
+# Qiskit and Aer are imported when the first gate is added (and preloaded in
+# the background once the window is up), so the window appears immediately
+circuit = None
+simulator = None
+# State the next circuit starts in: |1> at startup, |0> after Clear
+initial_state = "1"
+
+def get_simulator():
+    """The AerSimulator, created on first use."""
+    global simulator
+    if simulator is None:
+        from qiskit_aer import AerSimulator
+        simulator = AerSimulator()
+    return simulator
+
+def ensure_circuit():
+    """Create the circuit if the app has not needed it yet."""
+    if circuit is None:
+        setup_circuit(initial_state)
+    return circuit
+
+def reset_circuit():
+    """Drop the circuit; ensure_circuit creates a |0> one when it is next needed."""
+    global circuit, initial_state
+    circuit = None
+    initial_state = "0"
+
+
+def trajectory(circuit):
+    """Transpile the circuit and compute its Bloch trajectory; runs on a worker thread."""
+    from animation import circuit_frames
+    return circuit_frames(cached_transpile(circuit, get_simulator()))
 
 theta = 0
 
@@ -49,20 +79,11 @@ class QuantumVisualizer:
 
     def __init__(self):
         self.visualization_window = None
+        self.dialogs = None
+        self.worker = None
 
-    @staticmethod
-    def show_about():
+    def show_about(self):
         """Display project information."""
-        about_window = tk.Tk()
-        about_window.title('About')
-        about_window.geometry('650x470')
-
-        info_label = tk.Label(about_window, text="About Quantum Visualizer:", font=("Arial", 14))
-        info_label.pack()
-
-        text_widget = tk.Text(about_window, height=20, width=20)
-        text_widget.pack(fill='both', expand=True)
-
         info_text = """
         About: Visualization tool for Single Qubit Rotation on Bloch Sphere
         BY:Team ÅvinyÅ 
@@ -84,15 +105,12 @@ class QuantumVisualizer:
         Allowed range for theta (rotation_angle) in the app is [-2*PI, 2*PI]
 
         If visualization fails, the app closes automatically.
-        Only ten operations can be visualized at a time.
         """
-        text_widget.insert(END, info_text)
-
-        about_window.mainloop()
+        self.dialogs.about(info_text, heading="About Quantum Visualizer:")
 
     @staticmethod
-    def set_theta(num, window, circuit, key):
-        """Set theta value and close the input window."""
+    def set_theta(num, circuit, key):
+        """Set theta value and apply the rotation."""
         global theta
         theta = num * np.pi
         if key == 'x':
@@ -102,30 +120,10 @@ class QuantumVisualizer:
         else:
             circuit.rz(theta, 0)
         theta = 0
-        window.destroy()
 
     def get_theta(self, circuit, key):
         """Prompt user to input rotation angle for Rx, Ry, Rz gates."""
-        input_window = tk.Tk()
-        input_window.title('Input Theta')
-        input_window.geometry('540x270')
-        input_window.resizable(0, 0)
-
-        btns = [
-            ('PI/4', 0.25), ('PI/2', 0.50), ('PI', 1.0), ('2*PI', 2.0),
-            ('-PI/4', -0.25), ('-PI/2', -0.50), ('-PI', -1.0), ('-2*PI', -2.0)
-        ]
-
-        for idx, (text, val) in enumerate(btns):
-            btn = tk.Button(input_window, height=2, width=10, bg=BTN_COLOR, font=("Arial", 10), text=text,
-                            command=lambda v=val: self.set_theta(v, input_window, circuit, key))
-            btn.grid(row=idx//4, column=idx%4, padx=5, pady=5)
-
-        note_text = tk.Text(input_window, height=2, width=35, bg="light cyan")
-        note_text.insert(END, "Provide the value for theta\nRange: [-2*PI, 2*PI]")
-        note_text.grid(row=2, columnspan=4, pady=10)
-
-        input_window.mainloop()
+        self.dialogs.ask_theta(lambda num: self.set_theta(num, circuit, key), button_color=BTN_COLOR)
 
     def visualize(self, circuit):
         """Visualize the quantum circuit's single qubit rotations."""
@@ -138,31 +136,47 @@ class QuantumVisualizer:
         vis_frame = tk.Frame(self.visualization_window)
         vis_frame.pack(fill='both', expand=True)
 
-        try:
-            transpiled = transpile(circuit, simulator)
-            fig = visualize_transition(circuit=transpiled)
+        # Transpiling and the trajectory run on a worker thread; a newer request supersedes this one
+        self.worker.submit('visualize', trajectory, circuit.copy(),
+                           on_done=lambda frames: self.show_trajectory(vis_frame, frames),
+                           on_error=self.visualization_failed)
 
-            canvas = FigureCanvasTkAgg(fig, master=vis_frame)
-            canvas.draw()
-            canvas.get_tk_widget().pack(fill='both', expand=True)
+    def show_trajectory(self, vis_frame, frames):
+        """Animate precomputed Bloch vectors in the visualization window."""
+        from matplotlib.widgets import Button
+        from animation import BlochAnimator
+
+        if not vis_frame.winfo_exists():
+            return
+        try:
+            animator = BlochAnimator(vis_frame)
+            animator.play_frames(frames)
+            fig = animator.figure
 
             # Create an "End" button on the Matplotlib figure
             end_ax = fig.add_axes([0.85, 0.05, 0.1, 0.075])
-            end_button = Button(end_ax, 'End')
+            self.end_button = Button(end_ax, 'End')
 
             def close_vis(event):
+                animator.stop()
                 self.visualization_window.destroy()
 
-            end_button.on_clicked(close_vis)
+            self.end_button.on_clicked(close_vis)
 
         except Exception as e:
-            print(e)
+            self.visualization_failed(e)
+
+    def visualization_failed(self, error):
+        print(error)
+        if self.visualization_window.winfo_exists():
             self.visualization_window.destroy()
 
     def main(self, testing=False):
         """Main application function."""
         try:
             root = tk.Tk()
+            self.dialogs = DialogManager(root)
+            self.worker = TkWorker(root)
             root.title('Quantum Visualizer')
             current_dir = os.path.dirname(os.path.abspath(__file__))
             if system() == 'Windows':
@@ -180,10 +194,9 @@ class QuantumVisualizer:
             display.pack(padx=3, pady=4)
 
             def update_display(gate):
+                # The Entry scrolls, so there is no limit on the number of gates
                 display.insert(END, gate)
-                if len(display.get()) == 10:
-                    for btn in buttons:
-                        btn.config(state=tk.DISABLED)
+                display.xview_moveto(1)
 
             buttons = [
                 ('X', 'x', lambda: circuit.x(0)),
@@ -201,19 +214,16 @@ class QuantumVisualizer:
 
             for i, (text, display_text, cmd) in enumerate(buttons):
                 btn = tk.Button(button_frame, font=BTN_FONT, bg=BTN_COLOR, text=text,
-                                command=lambda d=display_text, c=cmd: [update_display(d), c()])
+                                command=lambda d=display_text, c=cmd: [update_display(d), ensure_circuit(), c()])
                 btn.grid(row=i//3, column=i%3, padx=5, pady=5, sticky='WE')
-                buttons[i] = btn
 
             def clear_display(circuit):
                 display.delete(0, END)
-                setup_circuit()
-                for btn in buttons:
-                    btn.config(state=tk.NORMAL)
+                reset_circuit()
 
             special_buttons = [
                 ('Quit', root.destroy),
-                ('Visualize', lambda: self.visualize(circuit)),
+                ('Visualize', lambda: self.visualize(ensure_circuit())),
                 ('Clear', lambda: clear_display(circuit)),
                 ('About', self.show_about)
             ]
@@ -226,6 +236,7 @@ class QuantumVisualizer:
                 root.update_idletasks()
                 root.update()
             else:
+                lazy.preload()
                 root.mainloop()
 
             return True
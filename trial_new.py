@@ -6,12 +6,13 @@ import tkinter as tk
 from tkinter import *
 import warnings
 import numpy as np
-from qiskit import QuantumCircuit, transpile
-from qiskit_aer import AerSimulator
-from qiskit.visualization import visualize_transition, plot_bloch_multivector, plot_state_city, plot_histogram
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-import matplotlib.pyplot as plt
-from matplotlib.widgets import Button
+
+import bloch
+import lazy
+import measurement
+import statevector
+from dialogs import DialogManager
+from qiskit_cache import cached_statevector
 
 # Suppress warnings
 warnings.simplefilter("ignore")
@@ -19,10 +20,33 @@ warnings.simplefilter("ignore")
 # Setup the quantum circuit
 def setup_circuit(qubits=1):
     global circuit, simulator
+    from qiskit import QuantumCircuit
     circuit = QuantumCircuit(qubits)
-    simulator = AerSimulator()
-
-setup_circuit(2)  # Change the number of qubits as needed
+    simulator = get_simulator()
+
+# Qiskit and Aer are imported when the first gate is added (and preloaded in
+# the background once the window is up), so the window appears immediately
+circuit = None
+simulator = None
+
+def get_simulator():
+    """The AerSimulator, created on first use."""
+    global simulator
+    if simulator is None:
+        from qiskit_aer import AerSimulator
+        simulator = AerSimulator()
+    return simulator
+
+def ensure_circuit():
+    """Create the circuit if the app has not needed it yet."""
+    if circuit is None:
+        setup_circuit(2)  # Change the number of qubits as needed
+    return circuit
+
+def reset_circuit():
+    """Drop the circuit; ensure_circuit creates an empty one when it is next needed."""
+    global circuit
+    circuit = None
 
 theta = 0
 
@@ -38,20 +62,15 @@ class QuantumVisualizer:
 
     def __init__(self):
         self.visualization_window = None
-
-    @staticmethod
-    def show_about():
+        self.dialogs = None
+        # Statevector of the first self.evolved_count instructions of self.evolved_circuit
+        self.statevector = None
+        self.evolved_circuit = None
+        self.evolved_count = 0
+        self.rng = np.random.default_rng()
+
+    def show_about(self):
         """Display project information."""
-        about_window = tk.Tk()
-        about_window.title('About')
-        about_window.geometry('650x470')
-
-        info_label = tk.Label(about_window, text="About Quantum Visualizer:", font=("Arial", 14))
-        info_label.pack()
-
-        text_widget = tk.Text(about_window, height=20, width=20)
-        text_widget.pack(fill='both', expand=True)
-
         info_text = """
         About: Visualization tool for Quantum Gates on Multiple Qubits
         BY: Team ÅvinyÅ
@@ -74,15 +93,12 @@ class QuantumVisualizer:
         Allowed range for theta (rotation_angle) in the app is [-2*PI, 2*PI]
 
         If visualization fails, the app closes automatically.
-        Only ten operations can be visualized at a time.
         """
-        text_widget.insert(END, info_text)
-
-        about_window.mainloop()
+        self.dialogs.about(info_text, heading="About Quantum Visualizer:")
 
     @staticmethod
-    def set_theta(num, window, circuit, key, target):
-        """Set theta value and close the input window."""
+    def set_theta(num, circuit, key, target):
+        """Set theta value and apply the rotation."""
         global theta
         theta = num * np.pi
         if key == 'x':
@@ -92,33 +108,36 @@ class QuantumVisualizer:
         else:
             circuit.rz(theta, target)
         theta = 0
-        window.destroy()
 
     def get_theta(self, circuit, key, target):
         """Prompt user to input rotation angle for Rx, Ry, Rz gates."""
-        input_window = tk.Tk()
-        input_window.title('Input Theta')
-        input_window.geometry('360x160')
-        input_window.resizable(0, 0)
-
-        btns = [
-            ('PI/4', 0.25), ('PI/2', 0.50), ('PI', 1.0), ('2*PI', 2.0),
-            ('-PI/4', -0.25), ('-PI/2', -0.50), ('-PI', -1.0), ('-2*PI', -2.0)
-        ]
-
-        for idx, (text, val) in enumerate(btns):
-            btn = tk.Button(input_window, height=2, width=10, bg=BTN_COLOR, font=("Arial", 10), text=text,
-                            command=lambda v=val: self.set_theta(v, input_window, circuit, key, target))
-            btn.grid(row=idx//4, column=idx%4, padx=5, pady=5)
-
-        note_text = tk.Text(input_window, height=2, width=35, bg="light cyan")
-        note_text.insert(END, "Provide the value for theta\nRange: [-2*PI, 2*PI]")
-        note_text.grid(row=2, columnspan=4, pady=10)
-
-        input_window.mainloop()
-
-    def visualize(self, circuit):
-        """Visualize the quantum circuit's state vector."""
+        self.dialogs.ask_theta(lambda num: self.set_theta(num, circuit, key, target), button_color=BTN_COLOR)
+
+    def current_statevector(self, circuit):
+        """Statevector of circuit, evolving only the instructions added since the last call."""
+        from qiskit.quantum_info import Statevector
+
+        if (circuit is not self.evolved_circuit or self.evolved_count > len(circuit.data)
+                or self.statevector is None):
+            # New or cleared circuit: start again from |0...0>
+            self.statevector = Statevector.from_label('0' * circuit.num_qubits)
+            self.evolved_circuit = circuit
+            self.evolved_count = 0
+        for instruction in circuit.data[self.evolved_count:]:
+            operation = instruction.operation
+            if operation.name in ('barrier', 'measure'):
+                continue
+            qargs = [circuit.find_bit(qubit).index for qubit in instruction.qubits]
+            self.statevector = self.statevector.evolve(operation, qargs=qargs)
+        self.evolved_count = len(circuit.data)
+        return self.statevector
+
+    def visualize(self, circuit, full=False):
+        """Visualize the quantum circuit's state vector.
+
+        The state is evolved incrementally; full=True re-runs the whole
+        circuit on the Aer simulator instead.
+        """
         if self.visualization_window and self.visualization_window.winfo_exists():
             self.visualization_window.destroy()
 
@@ -128,14 +147,27 @@ class QuantumVisualizer:
         vis_frame = tk.Frame(self.visualization_window)
         vis_frame.pack(fill='both', expand=True)
 
-        try:
-            transpiled = transpile(circuit, simulator)
-            fig, ax = plt.subplots(1, 3, figsize=(15, 5))
+        from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+        import matplotlib.pyplot as plt
+        from matplotlib.widgets import Button
 
-            state_vector = simulator.run(transpiled).result().get_statevector()
-            plot_bloch_multivector(state_vector, ax=ax[0])
-            plot_state_city(state_vector, ax=ax[1])
-            ax[2].remove()
+        try:
+            if full:
+                state_vector = cached_statevector(circuit, get_simulator())
+            else:
+                state_vector = self.current_statevector(circuit)
+            amplitudes = np.asarray(state_vector)
+            n = circuit.num_qubits
+
+            # One sphere per qubit from its reduced state, probabilities underneath
+            fig = plt.figure(figsize=(max(5 * n, 10), 9))
+            grid = fig.add_gridspec(2, n, height_ratios=(3, 2))
+            spheres = [fig.add_subplot(grid[0, qubit], projection='3d') for qubit in range(n)]
+            bloch.plot_bloch_vectors(statevector.bloch_vectors(amplitudes, n), spheres)
+            probability_ax = fig.add_subplot(grid[1, :])
+            probability_ax.bar(measurement.labels(np.arange(amplitudes.size), n),
+                               measurement.probabilities(amplitudes), color='#648fff')
+            probability_ax.set_ylabel('Probability')
 
             canvas = FigureCanvasTkAgg(fig, master=vis_frame)
             canvas.draw()
@@ -154,20 +186,23 @@ class QuantumVisualizer:
             print(e)
             self.visualization_window.destroy()
 
-    def measure_and_visualize(self, circuit):
-        """Measure the quantum circuit and visualize the result probabilities."""
-        circuit.measure_all()
-        transpiled = transpile(circuit, simulator)
-        result = simulator.run(transpiled).result()
-        counts = result.get_counts()
+    def measure_and_visualize(self, circuit, shots=measurement.DEFAULT_SHOTS):
+        """Measure the quantum circuit and visualize the result probabilities.
 
-        fig = plot_histogram(counts)
+        The shots are sampled from the statevector, so the circuit is left
+        without measurements and can still be extended.
+        """
+        import matplotlib.pyplot as plt
+
+        counts = measurement.counts(self.current_statevector(circuit), shots, self.rng)
+        measurement.histogram(counts)
         plt.show()
 
     def main(self, testing=False):
         """Main application function."""
         try:
             root = tk.Tk()
+            self.dialogs = DialogManager(root)
             root.title('Quantum Visualizer')
             current_dir = os.path.dirname(os.path.abspath(__file__))
             if system() == 'Windows':
@@ -185,23 +220,17 @@ class QuantumVisualizer:
             display.pack(padx=3, pady=4)
 
             def update_display(gate):
+                # The Entry scrolls, so there is no limit on the number of gates
                 display.insert(END, gate)
-                if len(display.get()) == 10:
-                    for btn in buttons:
-                        btn.config(state=DISABLED)
+                display.xview_moveto(1)
 
             def clear_display(circuit):
                 display.delete(0, END)
-                setup_circuit(2)  # Change the number of qubits as needed
-                for btn in buttons:
-                    btn.config(state=NORMAL)
-
-            buttons = []
+                reset_circuit()
 
             def create_gate_button(text, gate, cmd, row, col):
-                btn = tk.Button(button_frame, font=BTN_FONT, bg=BTN_COLOR, text=text, command=lambda: [update_display(gate), cmd()])
+                btn = tk.Button(button_frame, font=BTN_FONT, bg=BTN_COLOR, text=text, command=lambda: [update_display(gate), ensure_circuit(), cmd()])
                 btn.grid(row=row, column=col, padx=5, pady=5, sticky='WE')
-                buttons.append(btn)
 
             # Single-qubit gates
             create_gate_button('X', 'x', lambda: circuit.x(0), 0, 0)
@@ -221,8 +250,9 @@ class QuantumVisualizer:
 
             special_buttons = [
                 ('Quit', root.destroy),
-                ('Visualize Bloch', lambda: self.visualize(circuit)),
-                ('Measure & Visualize', lambda: self.measure_and_visualize(circuit)),
+                ('Visualize Bloch', lambda: self.visualize(ensure_circuit())),
+                ('Full Simulation', lambda: self.visualize(ensure_circuit(), full=True)),
+                ('Measure & Visualize', lambda: self.measure_and_visualize(ensure_circuit())),
                 ('Clear', lambda: clear_display(circuit)),
                 ('About', self.show_about)
             ]
@@ -235,6 +265,7 @@ class QuantumVisualizer:
                 root.update_idletasks()
                 root.update()
             else:
+                lazy.preload()
                 root.mainloop()
 
             return True
@@ -0,0 +1,113 @@
+#background jobs for the Tk apps: heavy work off the UI thread, results back via root.after
+"""Run simulation and rendering without freezing the Tk window.
+
+Jobs run on an executor (a thread pool by default) and their results are
+handed back to the Tk thread by polling a queue with root.after, since
+Tk widgets may only be touched from the thread running mainloop. Jobs
+are submitted under a key; submitting again under the same key
+supersedes the previous job, which is cancelled if it has not started
+and has its result dropped otherwise.
+
+    worker = TkWorker(root)
+    worker.submit('visualize', compute_frames, circuit, on_done=animator.play_frames)
+"""
+import base64
+from concurrent.futures import ThreadPoolExecutor
+import queue
+import tkinter as tk
+
+# Poll the result queue at about 60 Hz while jobs are pending
+POLL_MS = 16
+
+
+class TkWorker:
+    """Executor whose callbacks run on the Tk thread."""
+
+    def __init__(self, root, max_workers=2, poll_ms=POLL_MS, executor=None):
+        self.root = root
+        self.poll_ms = poll_ms
+        self.executor = executor or ThreadPoolExecutor(max_workers=max_workers,
+                                                       thread_name_prefix='tk-worker')
+        self._results = queue.Queue()
+        # key -> (generation, future) of the latest job
+        self._latest = {}
+        self._generation = 0
+        self._poll_job = None
+
+    def submit(self, key, function, *args, on_done=None, on_error=None):
+        """Run function(*args) in the background, superseding the job under key.
+
+        on_done(result) or on_error(exception) is called on the Tk thread,
+        only if no newer job was submitted under key in the meantime.
+        Without on_error, exceptions are printed.
+        """
+        self.cancel(key)
+        self._generation += 1
+        generation = self._generation
+        future = self.executor.submit(function, *args)
+        self._latest[key] = (generation, future)
+        future.add_done_callback(
+            lambda done: self._results.put((key, generation, done, on_done, on_error)))
+        self._schedule()
+        return future
+
+    def cancel(self, key):
+        """Cancel the job under key; a job already running finishes but is ignored."""
+        latest = self._latest.pop(key, None)
+        if latest is not None:
+            latest[1].cancel()
+
+    def pending(self, key):
+        return key in self._latest
+
+    def shutdown(self):
+        for key in list(self._latest):
+            self.cancel(key)
+        if self._poll_job is not None:
+            self.root.after_cancel(self._poll_job)
+            self._poll_job = None
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+    def _schedule(self):
+        if self._poll_job is None:
+            self._poll_job = self.root.after(self.poll_ms, self._poll)
+
+    def _poll(self):
+        self._poll_job = None
+        try:
+            alive = self.root.winfo_exists()
+        except Exception:
+            alive = False
+        if not alive:
+            self.shutdown()
+            return
+        try:
+            self._deliver()
+        finally:
+            # A failing callback must not stop the delivery of later results
+            if self._latest:
+                self._schedule()
+
+    def _deliver(self):
+        while True:
+            try:
+                key, generation, future, on_done, on_error = self._results.get_nowait()
+            except queue.Empty:
+                break
+            latest = self._latest.get(key)
+            if latest is None or latest[0] != generation or future.cancelled():
+                continue  # superseded or cancelled
+            del self._latest[key]
+            error = future.exception()
+            if error is None:
+                if on_done is not None:
+                    on_done(future.result())
+            elif on_error is not None:
+                on_error(error)
+            else:
+                print(f"{key} failed: {error}")
+
+
+def png_photo(png, master=None):
+    """tk.PhotoImage of PNG bytes, e.g. an image rendered by a background job."""
+    return tk.PhotoImage(master=master, data=base64.b64encode(png).decode('ascii'), format='png')